@@ -1,69 +1,78 @@
 # Import all board pins.
+import os
+import sys
 import time
 import board
 import busio
 
-GREEN_LED = 1
-RED_LED = 2
-YELLOW_LED = 3
-
-
 # Import the HT16K33 LED matrix module.
 from adafruit_ht16k33 import matrix
 
-from led8x8flash import Led8x8Flash
-from led8x8fibonacci import Led8x8Fibonacci
-from led8x8wopr import Led8x8Wopr
-from led8x8idle import Led8x8Idle
-from led8x8life import Led8x8Life
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pkg_classes.led8x8pattern import GREEN, RED, YELLOW
+from pkg_classes.led8x8flash import Led8x8Flash
+from pkg_classes.led8x8fibonacci import Led8x8Fibonacci
+from pkg_classes.led8x8wopr import Led8x8Wopr
+from pkg_classes.led8x8idle import Led8x8Idle
+from pkg_classes.led8x8life import Led8x8Life
 
 # Create the I2C interface.
 i2c = busio.I2C(board.SCL, board.SDA)
 
 # Create the matrix class.
 
-MATRIX = matrix.Matrix8x8x2(i2c)
+MATRIX = matrix.Matrix8x8x2(i2c, auto_write=False)
+
+def show(pattern):
+    """ render the next frame of the pattern and write it to the matrix """
+    green, red = pattern.render()
+    for x in range(8):
+        for y in range(8):
+            shift = x * 8 + y
+            MATRIX[x, y] = ((red >> shift) & 1) | (((green >> shift) & 1) << 1)
+    MATRIX.show()
 
-DISPLAY0 = Led8x8Flash(MATRIX,GREEN_LED)
+DISPLAY0 = Led8x8Flash(GREEN)
 
 """
 print("green")
 for i in range(3):
-    DISPLAY0.update()
+    show(DISPLAY0)
     time.sleep(0.5)
-    
+
 print("red")
 for i in range(3):
-    DISPLAY0.set_color(RED_LED)
-    DISPLAY0.update()
+    DISPLAY0.set_color(RED)
+    show(DISPLAY0)
     time.sleep(0.5)
 
 print("yellow")
 for i in range(3):
-    DISPLAY0.set_color(YELLOW_LED)
-    DISPLAY0.update()
+    DISPLAY0.set_color(YELLOW)
+    show(DISPLAY0)
     time.sleep(0.5)
 
-DISPLAY1 = Led8x8Fibonacci(MATRIX)
+DISPLAY1 = Led8x8Fibonacci()
 
 for i in range(32):
-    DISPLAY1.update()
+    show(DISPLAY1)
     time.sleep(0.2)
 
-DISPLAY2 = Led8x8Wopr(MATRIX)
+DISPLAY2 = Led8x8Wopr()
 
 for i in range(32):
-    DISPLAY2.update()
+    show(DISPLAY2)
     time.sleep(0.1)
-    
-DISPLAY3 = Led8x8Idle(MATRIX)
+
+DISPLAY3 = Led8x8Idle()
 
 for i in range(32):
-    DISPLAY3.update()
+    show(DISPLAY3)
     time.sleep(0.5)
-"""    
-DISPLAY4 = Led8x8Life(MATRIX)
+"""
+DISPLAY4 = Led8x8Life()
 
 for i in range(123):
-    DISPLAY4.update()
-    time.sleep(0.5)
\ No newline at end of file
+    show(DISPLAY4)
+    time.sleep(0.5)
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+""" Measure the dithered sub-frame rate in the simulator and, with --hardware,
+    on the real I2C bus; raise the bus speed with dtparam=i2c_arm_baudrate=400000
+    in /boot/config.txt and run again to compare
+
+    python3 examples/dither_benchmark.py
+    python3 examples/dither_benchmark.py --hardware
+"""
+
+import sys
+import argparse
+
+from scratch_logging import REPO, scratch_logging_file
+
+sys.path.insert(0, REPO)
+
+from pkg_classes.led8x8writer import Led8x8Writer
+from pkg_classes.led8x8dither import Led8x8Dither, measure_refresh
+from pkg_classes.led8x8life import Led8x8Life
+
+PARSER = argparse.ArgumentParser('Dithering refresh benchmark')
+PARSER.add_argument('--hardware', action='store_true', help='write to the LED backpack')
+PARSER.add_argument('--seconds', type=float, default=2.0, help='seconds per measurement')
+ARGS = PARSER.parse_args()
+
+LOGGING_FILE = scratch_logging_file('diyha-dither-')
+
+DITHER = Led8x8Dither()
+print('sub-frame build only   {:8.0f} sub-frames/s'.format(
+    measure_refresh(lambda green, red: None, ARGS.seconds)))
+
+WRITER = Led8x8Writer(LOGGING_FILE, simulate=not ARGS.hardware)
+TARGET = 'hardware' if ARGS.hardware else 'simulator'
+print('build and write to {:9s} {:4.0f} sub-frames/s'.format(
+    TARGET, measure_refresh(WRITER.write, ARGS.seconds)))
+
+TRACE = []
+
+def traced_write(green, red):
+    """ write a sub-frame and keep it for the blink check """
+    TRACE.append((green, red))
+    WRITER.write(green, red)
+
+def longest_dark(planes, duty):
+    """ most sub-frames between two lit sub-frames of any partly lit pixel """
+    longest = 0
+    for pixel in range(64):
+        if not 0 < duty[pixel] < DITHER.steps:
+            continue
+        lit = [index for index, plane in enumerate(planes) if (plane >> pixel) & 1]
+        longest = max([longest] + [after - before for before, after in zip(lit, lit[1:])])
+    return longest
+
+# Life fades at the default sub-frame rate for one tick, tracing every sub-frame
+LIFE = Led8x8Life()
+LONGEST = 0
+for _ in range(10):
+    DITHER.set_levels(*LIFE.render_levels())
+    del TRACE[:]
+    DITHER.run(traced_write, 0.5)
+    LONGEST = max(LONGEST,
+                  longest_dark([green for green, _ in TRACE], DITHER.green_duty),
+                  longest_dark([red for _, red in TRACE], DITHER.red_duty))
+print('life fades at {:.0f} Hz target: {subframes} sub-frames, {overruns} overruns, '
+      '{refresh:.0f}/s achieved, {achievable:.0f}/s achievable'.format(
+          1.0 / DITHER.period, **DITHER.get_stats()))
+print('slowest traced blink {} sub-frames, {:.0f} Hz at the achieved rate'.format(
+    LONGEST, DITHER.get_stats()['refresh'] / max(LONGEST, 1)))
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+""" Search random soups for long lived Game of Life seeds and write the seed library
+
+    python3 examples/life_seed_search.py --soups 200000 --seeds 64
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pkg_classes.led8x8lifeseeds import SEED_FILE, search, save_seeds
+
+def main():
+    """ search the soups and write the library """
+    parser = argparse.ArgumentParser('Game of Life seed search')
+    parser.add_argument('--soups', type=int, default=100000, help='random soups to simulate')
+    parser.add_argument('--seeds', type=int, default=64, help='seeds to keep')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes')
+    parser.add_argument('--output', default=SEED_FILE, help='seed library file')
+    args = parser.parse_args()
+
+    start = time.time()
+    seeds = search(args.soups, args.seeds, args.processes)
+    elapsed = time.time() - start
+    save_seeds(seeds, args.output)
+
+    print('{} soups in {:.1f}s ({:.0f} soups/s)'.format(args.soups, elapsed,
+                                                        args.soups / elapsed))
+    for seed, transient, period in seeds[:10]:
+        print('{:016x} transient {:3d} period {:3d}'.format(seed, transient, period))
+    print('wrote {} seeds to {}'.format(len(seeds), args.output))
+
+# the worker processes import this module, so only search when run directly
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+""" Generations per second of the packed Life universe as it grows; run it
+    on the Pi to pick a --universe size that fits the 0.5 s Life tick
+
+    python3 examples/life_universe_benchmark.py
+    python3 examples/life_universe_benchmark.py --sizes 64 256 1024 --seconds 5
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pkg_classes.led8x8life import Led8x8Life
+
+SLEEP_TIME = 0.5
+
+PARSER = argparse.ArgumentParser('Life universe benchmark')
+PARSER.add_argument('--sizes', type=int, nargs='+', default=[8, 64, 128, 256, 512],
+                    help='universe sizes, multiples of 8')
+PARSER.add_argument('--seconds', type=float, default=2.0, help='seconds per size')
+ARGS = PARSER.parse_args()
+
+print('{:>6} {:>12} {:>10} {:>8}'.format('size', 'generations/s', 'ms/tick', 'budget'))
+for size in ARGS.sizes:
+    # render steps the universe, ages the cells and moves the viewport
+    LIFE = Led8x8Life(size=size)
+    COUNT = 0
+    START = time.perf_counter()
+    while time.perf_counter() - START < ARGS.seconds:
+        LIFE.render()
+        COUNT += 1
+    ELAPSED = time.perf_counter() - START
+    TICK = ELAPSED / COUNT
+    print('{:>6} {:>12.0f} {:>10.3f} {:>7.2%}'.format(size, COUNT / ELAPSED, TICK * 1000.0,
+                                                     TICK / SLEEP_TIME))
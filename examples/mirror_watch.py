@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+""" Print the frames a matrix started with --mirror is showing
+
+    python3 examples/mirror_watch.py --mqtt 192.168.1.10 --location diy/main/living
+"""
+
+import os
+import sys
+import argparse
+
+import paho.mqtt.client as mqtt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pkg_classes.led8x8framebuffer import Led8x8FrameBuffer, bytes_to_frame, FRAME_BYTES
+from pkg_classes.led8x8mirror import MIRROR_TOPIC
+
+PIXELS = '.RGY'
+
+PARSER = argparse.ArgumentParser('Matrix mirror watcher')
+PARSER.add_argument('--mqtt', required=True, help='MQTT server IP address')
+PARSER.add_argument('--location', required=True, help='location topic of the matrix')
+ARGS = PARSER.parse_args()
+
+DISPLAY = Led8x8FrameBuffer()
+
+def on_connect(client, userdata, flags, rc_msg):
+    """ subscribe to the mirror; the retained frame arrives at once """
+    #pylint: disable=unused-argument
+    client.subscribe(ARGS.location + MIRROR_TOPIC, 0)
+
+def on_message(client, userdata, msg):
+    """ print the mirrored frame """
+    #pylint: disable=unused-argument
+    if len(msg.payload) != FRAME_BYTES:
+        return
+    DISPLAY.set_frame(*bytes_to_frame(msg.payload))
+    print('retained' if msg.retain else 'live')
+    for ypixel in range(8):
+        print(''.join(PIXELS[DISPLAY[xpixel, ypixel]] for xpixel in range(8)))
+
+CLIENT = mqtt.Client()
+CLIENT.on_connect = on_connect
+CLIENT.on_message = on_message
+CLIENT.connect(ARGS.mqtt, 1883, 60)
+CLIENT.loop_forever()
@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+""" Blast MQTT system messages at matrix.py and measure publish to frame latency
+
+    matrix.py runs in process against a local stand-in for the broker and a
+    simulated display, so no broker or LED backpack is needed.
+
+    python3 examples/mqtt_load_test.py --rate 200 --duration 10 --mix security=1
+    python3 examples/mqtt_load_test.py --rate 50 --mix security=4,demo=1,fire=1
+"""
+
+import os
+import sys
+import time
+import queue
+import bisect
+import argparse
+import importlib.util
+from threading import Thread
+
+from scratch_logging import REPO, scratch_logging_file
+
+sys.path.insert(0, REPO)
+
+from pkg_classes.led8x8pattern import ALERT_MODES, color_planes
+
+TOPICS = ['demo', 'fire', 'panic', 'security', 'silent']
+
+class Message:
+    """ the parts of a paho MQTTMessage used by matrix.py plus time stamps """
+
+    def __init__(self, topic, payload, published):
+        """ save the topic, payload and publish time """
+        self.topic = topic
+        self.payload = payload
+        self.qos = 1
+        self.retain = False
+        self.published = published
+        self.handled = None
+
+class LocalClient:
+    """ the parts of a paho Client used by matrix.py """
+
+    def __init__(self, broker):
+        """ save the broker """
+        self.broker = broker
+
+    def subscribe(self, topic, qos=0):
+        """ subscribe to a topic or a list of (topic, qos) """
+        #pylint: disable=unused-argument
+        if isinstance(topic, list):
+            for name, _ in topic:
+                self.broker.subscriptions.add(name)
+        else:
+            self.broker.subscriptions.add(topic)
+        return 0, 0
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        """ publish through the local broker """
+        #pylint: disable=unused-argument
+        self.broker.publish(topic, payload)
+
+class LocalBroker:
+    """ in process broker stand-in delivering messages on one thread like paho's loop """
+
+    def __init__(self, on_message):
+        """ create the message queue and the client seen by matrix.py """
+        self.on_message = on_message
+        self.queue = queue.Queue()
+        self.subscriptions = set()
+        self.client = LocalClient(self)
+        self.published = 0
+        self.handled = []
+
+    def publish(self, topic, payload):
+        """ queue a message for delivery """
+        self.published += 1
+        self.queue.put(Message(topic, payload, time.perf_counter()))
+
+    def delivery_thread(self,):
+        """ deliver queued messages to subscribed topics """
+        while True:
+            msg = self.queue.get()
+            if msg is None:
+                return
+            if msg.topic in self.subscriptions:
+                self.on_message(self.client, None, msg)
+                msg.handled = time.perf_counter()
+                self.handled.append(msg)
+
+    def run(self,):
+        """ start the delivery thread """
+        delivery = Thread(target=self.delivery_thread)
+        delivery.daemon = True
+        delivery.start()
+
+class FrameProbe:
+    """ HAL frame listener recording when each frame became visible """
+
+    def __init__(self,):
+        """ create an empty frame log """
+        self.times = []
+        self.frames = []
+
+    def on_frame(self, green, red, mode, state):
+        """ record the time the frame was written and what it showed """
+        self.times.append(time.perf_counter())
+        self.frames.append((green, red, mode, state))
+
+def expectation(matrix, topic, payload):
+    """ return a test for the frames that show the result of a message """
+    display = matrix.DISPLAY
+    name = topic.rsplit('/', 1)[-1]
+    on = payload == b'ON'
+    if name in ('fire', 'panic'):
+        alert = matrix.FIRE_MODE if name == 'fire' else matrix.PANIC_MODE
+        if on:
+            # the flash has shown its color, not only its blank half
+            lit = color_planes(display.patterns[alert].color)
+            return lambda green, red, mode, state: mode == alert and (green, red) == lit
+        return lambda green, red, mode, state: mode not in ALERT_MODES
+    if name == 'security' and on:
+        # a blank frame unless an alert is showing through
+        return lambda green, red, mode, state: (state == matrix.SECURITY_STATE and
+                                                (mode in ALERT_MODES or (green | red) == 0))
+    if (name == 'demo' and not on) or (name == 'silent' and on):
+        return lambda green, red, mode, state: state == matrix.IDLE_STATE
+    return lambda green, red, mode, state: state == matrix.DEMO_STATE
+
+def load_matrix():
+    """ import matrix.py with a simulated display and logging in a scratch directory """
+    os.environ['DIYHA_LOGGING_FILE'] = scratch_logging_file('diyha-loadtest-')
+    sys.argv = ['matrix.py', '--mqtt', 'localhost', '--location', 'diy/loadtest', '--simulate']
+    spec = importlib.util.spec_from_file_location('matrix', os.path.join(REPO, 'matrix.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def parse_mix(mix):
+    """ turn security=4,demo=1 into a weighted list of topics """
+    topics = []
+    for entry in mix.split(','):
+        name, _, weight = entry.partition('=')
+        if name not in TOPICS:
+            raise ValueError('unknown topic {}; choose from {}'.format(name, TOPICS))
+        topics.extend(['diy/system/' + name] * int(weight or 1))
+    return topics
+
+def blast(broker, topics, rate, duration):
+    """ publish the mix at a fixed rate alternating ON and OFF per topic """
+    payloads = {}
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    count = int(rate * duration)
+    for index in range(count):
+        topic = topics[index % len(topics)]
+        payloads[topic] = b'OFF' if payloads.get(topic) == b'ON' else b'ON'
+        delay = start + index * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        broker.publish(topic, payloads[topic])
+
+def percentile(values, fraction):
+    """ nearest rank percentile of a sorted list """
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def report(matrix, broker, probe, deadline, cpu_seconds):
+    """ match every handled message to the first frame written after it that shows it """
+    handled = broker.handled
+    times = probe.times
+    frames = probe.frames
+    latency = []
+    queued = sorted(msg.handled - msg.published for msg in handled)
+    coalesced = 0
+    for index, msg in enumerate(handled):
+        shows = expectation(matrix, msg.topic, msg.payload)
+        following = handled[index + 1].handled if index + 1 < len(handled) else None
+        position = bisect.bisect_left(times, msg.handled)
+        while position < len(times) and (following is None or times[position] <= following):
+            if shows(*frames[position]):
+                break
+            position += 1
+        if position == len(times) or (following is not None and times[position] > following):
+            coalesced += 1
+            continue
+        latency.append(times[position] - msg.published)
+    latency.sort()
+    delayed = sum(1 for value in latency if value > deadline)
+    print('published        {}'.format(broker.published))
+    print('handled          {}'.format(len(handled)))
+    print('undelivered      {}'.format(broker.published - len(handled)))
+    print('coalesced        {}  (superseded before a frame showed them)'.format(coalesced))
+    print('delayed          {}  (visible after more than {:.3f}s)'.format(delayed, deadline))
+    print('frames written   {}'.format(len(times)))
+    for name, values in (('queue', queued), ('visible', latency)):
+        print('{:8s} latency  p50 {:.4f}s  p95 {:.4f}s  p99 {:.4f}s  max {:.4f}s'.format(
+            name, percentile(values, 0.50), percentile(values, 0.95),
+            percentile(values, 0.99), values[-1] if values else float('nan')))
+    if handled:
+        print('cpu per message  {:.1f}us'.format(cpu_seconds * 1e6 / len(handled)))
+
+def main():
+    """ parse arguments, run the load and print the results """
+    parser = argparse.ArgumentParser('MQTT load and latency test')
+    parser.add_argument('--rate', type=float, default=100.0, help='messages per second')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load')
+    parser.add_argument('--mix', default='security=1',
+                        help='weighted topics, e.g. security=4,demo=1')
+    parser.add_argument('--deadline', type=float, default=0.5,
+                        help='seconds before a message is late')
+    args = parser.parse_args()
+    topics = parse_mix(args.mix)
+
+    matrix = load_matrix()
+    probe = FrameProbe()
+    matrix.DISPLAY.add_frame_listener(probe.on_frame)
+    broker = LocalBroker(matrix.on_message)
+    matrix.on_connect(broker.client, None, {}, 0)
+    broker.run()
+
+    # the display thread runs regardless; measure it alone to subtract from the load
+    cpu_start = time.process_time()
+    time.sleep(args.duration)
+    baseline = (time.process_time() - cpu_start) / args.duration
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    blast(broker, topics, args.rate, args.duration)
+    broker.queue.put(None)
+    while broker.queue.qsize() > 0:
+        time.sleep(0.01)
+    time.sleep(args.deadline)
+    elapsed = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start - baseline * elapsed
+
+    report(matrix, broker, probe, args.deadline, max(cpu_seconds, 0.0))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+""" Replay a frame capture recorded with matrix.py --record
+
+    python3 examples/replay.py /var/tmp/matrix-capture --show
+    python3 examples/replay.py /var/tmp/matrix-capture --fast
+"""
+
+import sys
+import argparse
+
+from scratch_logging import REPO, scratch_logging_file
+
+sys.path.insert(0, REPO)
+
+from pkg_classes.led8x8recorder import Led8x8Replayer
+from pkg_classes.led8x8writer import Led8x8Writer
+
+PIXELS = '.RGY'
+
+PARSER = argparse.ArgumentParser('Frame capture replay')
+PARSER.add_argument('capture', help='capture path given to --record')
+PARSER.add_argument('--fast', action='store_true', help='replay as fast as possible')
+PARSER.add_argument('--show', action='store_true', help='print every frame')
+ARGS = PARSER.parse_args()
+
+WRITER = Led8x8Writer(scratch_logging_file('diyha-replay-'), simulate=True)
+
+def show(green, red, mode, state):
+    """ write the frame through the simulated writer and optionally print it """
+    WRITER.write(green, red)
+    if ARGS.show:
+        print('mode {} state {}'.format(mode, state))
+        for ypixel in range(8):
+            print(''.join(PIXELS[WRITER.matrix8x8[xpixel, ypixel]] for xpixel in range(8)))
+
+STATS = Led8x8Replayer(ARGS.capture).play(show, not ARGS.fast)
+print('{frames} frames in {seconds:.3f}s ({fps:.0f} frames/s)'.format(**STATS))
+print('{writes} device writes'.format(**WRITER.get_metrics()))
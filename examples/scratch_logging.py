@@ -0,0 +1,20 @@
+#!/usr/bin/python3
+""" Logging settings for the example tools, writing to a scratch directory
+    instead of /var/log so they run without root
+"""
+
+import os
+import tempfile
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def scratch_logging_file(prefix):
+    """ copy logging.ini into a new scratch directory and return its path """
+    log_dir = tempfile.mkdtemp(prefix=prefix)
+    with open(os.path.join(REPO, 'logging.ini')) as source:
+        settings = source.read().replace("'/var/log/diyha-matrix.log'",
+                                         repr(os.path.join(log_dir, 'diyha-matrix.log')))
+    logging_file = os.path.join(log_dir, 'logging.ini')
+    with open(logging_file, 'w') as target:
+        target.write(settings)
+    return logging_file
@@ -27,6 +27,7 @@
 
 import os
 import time
+import random
 import logging
 import logging.config
 
@@ -43,13 +44,26 @@ from pkg_classes.led8x8hal import Led8x8HAL
 from pkg_classes.led8x8hal import IDLE_STATE, DEMO_STATE, SECURITY_STATE
 from pkg_classes.led8x8hal import FIRE_MODE, PANIC_MODE, FIBONACCI_MODE
 
+# fleet synchronized rendering
+
+from pkg_classes.led8x8fleet import Led8x8FleetCoordinator, Led8x8FleetFollower
+from pkg_classes.led8x8fleet import FLEET_TOPIC
+
+# optional capture of every frame for replay
+
+from pkg_classes.led8x8recorder import Led8x8Recorder
+
+# optional mirror of the frame shown for remote monitoring
+
+from pkg_classes.led8x8mirror import Led8x8Mirror
+
 # import normal diyha helper classes
 
 from pkg_classes.configmodel import ConfigModel
 
 # Start logging and enable imported classes to log appropriately.
 
-LOGGING_FILE = '/usr/local/diyha-matrix/logging.ini'
+LOGGING_FILE = os.environ.get('DIYHA_LOGGING_FILE', '/usr/local/diyha-matrix/logging.ini')
 logging.config.fileConfig( fname=LOGGING_FILE, disable_existing_loggers=False )
 LOGGER = logging.getLogger(__name__)
 LOGGER.info('Application started')
@@ -58,10 +72,46 @@ LOGGER.info('Application started')
 
 CONFIG = ConfigModel(LOGGING_FILE)
 
+METRICS_INTERVAL = 300
+
+# reconnect with exponential backoff and full jitter so that every unit does
+# not hit a restarted broker at the same moment
+
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 120.0
+
+# last payload of each diy/system topic; retained copies replayed after a
+# reconnect are ignored unless the state changed during the outage
+
+SYSTEM_STATE = {}
+
 # Initialize devices
 
-DISPLAY = Led8x8HAL(LOGGING_FILE) # 8x8 LED backpack from Adafruit
-DISPLAY.run()
+DISPLAY = Led8x8HAL(LOGGING_FILE, CONFIG.get_simulate(), CONFIG.get_dither(),
+                    CONFIG.get_adaptive(),
+                    {'universe': CONFIG.get_universe()}) # 8x8 LED backpack from Adafruit
+
+if CONFIG.get_record() is not None:
+    RECORDER = Led8x8Recorder(LOGGING_FILE, CONFIG.get_record())
+    DISPLAY.add_frame_listener(RECORDER.on_frame)
+    RECORDER.run()
+
+# A coordinator renders for the fleet and, like a follower, shows the
+# broadcast frames at their time stamps so every room stays in lockstep.
+
+FLEET = CONFIG.get_fleet()
+FOLLOWER = None
+if FLEET in ('coordinator', 'follower'):
+    FOLLOWER = Led8x8FleetFollower(LOGGING_FILE, DISPLAY)
+    FOLLOWER.run()
+if FLEET == 'coordinator':
+    DISPLAY.set_device_output(False)
+if FLEET != 'follower':
+    DISPLAY.run()
+
+# created with the MQTT client when --mirror is given
+
+MIRROR = None
 
 # Process MQTT messages using a dispatch table algorithm.
 
@@ -69,6 +119,9 @@ DISPLAY.run()
 
 def system_message(client, msg):
     """ Log and process system messages. """
+    if msg.retain and SYSTEM_STATE.get(msg.topic) == msg.payload:
+        return
+    SYSTEM_STATE[msg.topic] = msg.payload
     LOGGER.info(msg.topic+" "+msg.payload.decode('utf-8'))
     if msg.topic == 'diy/system/fire':
         if msg.payload == b'ON':
@@ -96,6 +149,12 @@ def system_message(client, msg):
         else:
             DISPLAY.set_state(DEMO_STATE)
 
+def fleet_message(client, msg):
+    """ Buffer a batch of frames broadcast by the fleet coordinator. """
+    #pylint: disable=unused-argument
+    if FOLLOWER is not None:
+        FOLLOWER.on_message(msg.payload)
+
 #  A dictionary dispatch table is used to parse and execute MQTT messages.
 
 TOPIC_DISPATCH_DICTIONARY = {
@@ -109,6 +168,8 @@ TOPIC_DISPATCH_DICTIONARY = {
         {"method":system_message},
     "diy/system/silent":
         {"method":system_message},
+    FLEET_TOPIC:
+        {"method":fleet_message},
     }
 
 
@@ -119,41 +180,100 @@ def on_message(client, userdata, msg):
 
 
 def on_connect(client, userdata, flags, rc_msg):
-    """ Subscribing in on_connect() means that if we lose the connection and
-        reconnect then subscriptions will be renewed.
+    """ The persistent session queues QoS 1 messages while we are away. Subscribe
+        to every topic in one request on every connect, even when the session
+        is present, so the broker replies with the retained diy/system states
+        after a restart and a changed --fleet role gets its topic; SYSTEM_STATE
+        drops the retained copies we have already acted on.
     """
     #pylint: disable=unused-argument
-    client.subscribe("diy/system/demo", 1)
-    client.subscribe("diy/system/fire", 1)
-    client.subscribe("diy/system/panic", 1)
-    client.subscribe("diy/system/security", 1)
-    client.subscribe("diy/system/silent", 1)
-
+    if rc_msg != 0:
+        LOGGER.info('MQTT connection refused %s', str(rc_msg))
+        return
+    client.connected_flag = True
+    if MIRROR is not None:
+        # the retained snapshot may be stale after an outage
+        MIRROR.republish()
+    topics = [("diy/system/demo", 1),
+              ("diy/system/fire", 1),
+              ("diy/system/panic", 1),
+              ("diy/system/security", 1),
+              ("diy/system/silent", 1)]
+    if FOLLOWER is not None:
+        topics.append((FLEET_TOPIC, 0))
+    client.subscribe(topics)
 
 
 def on_disconnect(client, userdata, rc_msg):
-    """ Subscribing on_disconnect() tilt """
+    """ Flag the lost connection; the main loop reconnects and the display
+        keeps its last state until the broker catches us up.
+    """
     #pylint: disable=unused-argument
     client.connected_flag = False
     client.disconnect_flag = True
 
 
+def reconnect_delay(attempt):
+    """ exponential backoff with full jitter """
+    return random.uniform(0, min(RECONNECT_MAX, RECONNECT_MIN * 2 ** attempt))
+
+
 if __name__ == '__main__':
 
     # Setup MQTT handlers then wait for timed events or messages
 
-    CLIENT = mqtt.Client()
+    # a fixed client id and clean_session=False give a persistent session
+
+    CLIENT_ID = 'diyha-matrix-' + CONFIG.get_location().replace('/', '-')
+    CLIENT = mqtt.Client(client_id=CLIENT_ID, clean_session=False)
+    CLIENT.connected_flag = False
+    CLIENT.disconnect_flag = True
     CLIENT.on_connect = on_connect
     CLIENT.on_disconnect = on_disconnect
     CLIENT.on_message = on_message
 
-    # command line argument for the switch mode - motion activated is the default
+    # the coordinator broadcasts the frames rendered by the display thread
 
-    CLIENT.connect(CONFIG.get_broker(), 1883, 60)
-    CLIENT.loop_start()
+    if FLEET == 'coordinator':
+        COORDINATOR = Led8x8FleetCoordinator(LOGGING_FILE, CLIENT)
+        DISPLAY.add_render_listener(COORDINATOR.on_frame)
+        COORDINATOR.run()
 
-    # Loop forever checking for timed events every 10 seconds.
+    # publish the frames shown, coalesced and retained, for remote monitoring
 
-    while True:
-        time.sleep(1.0)
+    if CONFIG.get_mirror():
+        MIRROR = Led8x8Mirror(LOGGING_FILE, CLIENT, CONFIG.get_location())
+        DISPLAY.add_frame_listener(MIRROR.on_frame)
+        MIRROR.run()
+
+    # Loop forever running the MQTT network loop, reconnecting when the
+    # connection drops and logging display metrics.
 
+    ATTEMPT = 0
+    METRICS_TIME = time.time()
+    while True:
+        if CLIENT.disconnect_flag:
+            time.sleep(reconnect_delay(ATTEMPT))
+            ATTEMPT += 1
+            try:
+                CLIENT.connect(CONFIG.get_broker(), 1883, 60)
+                CLIENT.disconnect_flag = False
+            except OSError as ex:
+                LOGGER.info('MQTT connect failed %s', str(ex))
+                continue
+        try:
+            CLIENT.loop(1.0)
+        #pylint: disable=broad-except
+        except Exception as ex:
+            # paho re-raises handler exceptions; log them and keep running
+            LOGGER.error('MQTT handler exception %s', str(ex))
+        if CLIENT.connected_flag:
+            ATTEMPT = 0
+        if time.time() - METRICS_TIME > METRICS_INTERVAL:
+            METRICS_TIME = time.time()
+            LOGGER.info('Display metrics %s', DISPLAY.get_metrics())
+            if CONFIG.get_dither():
+                LOGGER.info('Dither metrics %s', DISPLAY.get_dither_stats())
+            LOGGER.info('Power metrics %s', DISPLAY.get_power_stats())
+            if MIRROR is not None:
+                LOGGER.info('Mirror metrics %s', MIRROR.get_stats())
@@ -40,6 +40,21 @@ class ConfigModel:
         PARSER = argparse.ArgumentParser('Command Line Parser')
         PARSER.add_argument('--mqtt', help='MQTT server IP address')
         PARSER.add_argument('--location', help='Location topic required')
+        PARSER.add_argument('--fleet', default='standalone',
+                            choices=['standalone', 'coordinator', 'follower'],
+                            help='Render locally, render for the fleet or follow the fleet')
+        PARSER.add_argument('--simulate', action='store_true',
+                            help='Render to an in memory display instead of the I2C backpack')
+        PARSER.add_argument('--record', default=None,
+                            help='Capture every frame to this path for replay')
+        PARSER.add_argument('--dither', action='store_true',
+                            help='Dither patterns with intensity levels, e.g. Life fades')
+        PARSER.add_argument('--adaptive', action='store_true',
+                            help='Slow the display down while the picture is still or blank')
+        PARSER.add_argument('--universe', type=int, default=8,
+                            help='Size of the Life universe, a multiple of 8, e.g. 64')
+        PARSER.add_argument('--mirror', action='store_true',
+                            help='Publish the frame shown to <location>/matrix/frame/state')
         ARGS = PARSER.parse_args()
         # command line arguement for the MQTT broker hostname or IP
         if ARGS.mqtt == None:
@@ -51,6 +66,23 @@ class ConfigModel:
             self.logger.error("Terminating> --location not provided")
             exit() # mandatory
         self.location = ARGS.location
+        # command line arguement for the fleet role
+        self.fleet = ARGS.fleet
+        # command line arguement to run without the LED backpack
+        self.simulate = ARGS.simulate
+        # command line arguement for the frame capture path
+        self.record = ARGS.record
+        # command line arguement to enable temporal dithering
+        self.dither = ARGS.dither
+        # command line arguement to enable the adaptive frame rate
+        self.adaptive = ARGS.adaptive
+        # command line arguement for the size of the Life universe
+        if ARGS.universe < 8 or ARGS.universe % 8:
+            self.logger.error("Terminating> --universe must be a multiple of 8")
+            exit()
+        self.universe = ARGS.universe
+        # command line arguement to mirror the display to MQTT
+        self.mirror = ARGS.mirror
 
     def get_broker(self, ):
         """ MQTT BORKER hostname or IP address."""
@@ -60,3 +92,30 @@ class ConfigModel:
         """ MQTT location topic for the device. """
         return self.location
 
+    def get_fleet(self, ):
+        """ Fleet role: standalone, coordinator or follower. """
+        return self.fleet
+
+    def get_simulate(self, ):
+        """ True to render to an in memory display. """
+        return self.simulate
+
+    def get_record(self, ):
+        """ Frame capture path or None. """
+        return self.record
+
+    def get_dither(self, ):
+        """ True to enable temporal dithering. """
+        return self.dither
+
+    def get_adaptive(self, ):
+        """ True to slow the display down while nothing changes. """
+        return self.adaptive
+
+    def get_universe(self, ):
+        """ Width and height of the Life universe. """
+        return self.universe
+
+    def get_mirror(self, ):
+        """ True to publish the frame shown for remote monitoring. """
+        return self.mirror
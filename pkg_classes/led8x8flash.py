@@ -2,24 +2,22 @@
 
 """ Display full screen flash color pattern on an Adafruit 8x8 LED backpack """
 
+from .led8x8pattern import Led8x8Pattern, register_pattern, color_planes
+from .led8x8pattern import FIRE_MODE, PANIC_MODE, RED, YELLOW
+
 PING = 0
 PONG = 1
 
-class Led8x8Flash:
+class Led8x8Flash(Led8x8Pattern):
     """ flash pattern based on color and time interval  """
 
-    def __init__(self, matrix8x8x2, color):
-        """ create initial conditions and saving display and I2C lock """
-        self.matrix = matrix8x8x2
+    __slots__ = ('color', 'alternate')
+
+    def __init__(self, color):
+        """ create initial conditions """
         self.alternate = PING
-        if color < 0:
-            self.color = 0
-            raise Exception('color must be greater than 0 color was: {}'.format(color))
-        elif color > 3:
-            self.color = 3
-            raise Exception('color must be less than 3 color was: {}'.format(color))
-        else:
-            self.color = color
+        self.color = 0
+        self.set_color(color)
 
     def reset(self,):
         """ initialize to starting state and set brightness """
@@ -36,16 +34,16 @@ class Led8x8Flash:
         else:
             self.color = color
 
-    def update(self,):
-        """ display the series as a 64 bit image with alternating colored pixels """
+    def render(self,):
+        """ alternate between a full frame of the color and a blank frame """
         if self.alternate == PING:
-            self.matrix.fill(self.color)
             self.alternate = PONG
-        else:
-            self.matrix.fill(0)
-            self.alternate = PING
-        #self.matrix.show()
+            return color_planes(self.color)
+        self.alternate = PING
+        return 0, 0
+
+register_pattern(FIRE_MODE, lambda: Led8x8Flash(RED), 0.2)
+register_pattern(PANIC_MODE, lambda: Led8x8Flash(YELLOW), 0.2)
 
 if __name__ == '__main__':
     exit()
-
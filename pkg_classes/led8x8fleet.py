@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+
+""" Render once and display in lockstep on a fleet of Adafruit 8x8 LED backpacks """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The coordinator stamps every rendered frame with the wall clock time it
+# should appear, PLAYOUT_DELAY seconds in the future, and publishes the frames
+# in batches. Followers buffer the batches and show each frame at its time
+# stamp. Units are kept in lockstep by their NTP synchronized clocks.
+
+import sys
+import time
+import struct
+import bisect
+from threading import Thread, Lock, Event
+import logging
+import logging.config
+
+FLEET_TOPIC = 'diy/matrix/fleet/frames'
+
+BATCH_SECONDS = 1.0
+PLAYOUT_DELAY = 2.5
+BUFFER_FRAMES = 256
+IDLE_WAIT = 1.0
+
+# batch header: base time stamp and frame count
+# frame: milliseconds after the base time stamp, green plane, red plane and
+#        mode << 4 | state, the mode and state the frame was rendered in
+
+HEADER_FORMAT = '!dH'
+FRAME_FORMAT = '!HQQB'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+FRAME_SIZE = struct.calcsize(FRAME_FORMAT)
+
+def encode_batch(frames):
+    """ pack a list of (time stamp, green, red, mode, state) frames into a batch payload """
+    base = frames[0][0]
+    payload = bytearray(struct.pack(HEADER_FORMAT, base, len(frames)))
+    for stamp, green, red, mode, state in frames:
+        offset = int(round((stamp - base) * 1000.0))
+        mode_state = ((mode & 0x0F) << 4) | (state & 0x0F)
+        payload += struct.pack(FRAME_FORMAT, offset, green, red, mode_state)
+    return bytes(payload)
+
+def decode_batch(payload):
+    """ unpack a batch payload into a list of (time stamp, green, red, mode, state) frames """
+    base, count = struct.unpack_from(HEADER_FORMAT, payload, 0)
+    frames = []
+    position = HEADER_SIZE
+    for _ in range(count):
+        offset, green, red, mode_state = struct.unpack_from(FRAME_FORMAT, payload, position)
+        frames.append((base + offset / 1000.0, green, red, mode_state >> 4, mode_state & 0x0F))
+        position += FRAME_SIZE
+    return frames
+
+class Led8x8FleetCoordinator:
+    """ collect frames rendered by the HAL and broadcast them in time stamped batches """
+
+    def __init__(self, logging_file, client, topic=FLEET_TOPIC):
+        """ save the MQTT client and create an empty batch """
+        logging.config.fileConfig(fname=logging_file, disable_existing_loggers=False)
+        # Get the logger specified in the file
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.topic = topic
+        self.pending = []
+        self.lock = Lock()
+
+    def on_frame(self, green, red, mode, state):
+        """ HAL render listener; stamp the frame with the time it should appear """
+        with self.lock:
+            self.pending.append((time.time() + PLAYOUT_DELAY, green, red, mode, state))
+
+    def publish_batch(self,):
+        """ publish the frames collected since the last batch """
+        with self.lock:
+            frames = self.pending
+            self.pending = []
+        if frames:
+            self.client.publish(self.topic, encode_batch(frames), 0)
+
+    def batch_thread(self,):
+        """ publish a batch every BATCH_SECONDS off the display thread """
+        while True:
+            time.sleep(BATCH_SECONDS)
+            try:
+                self.publish_batch()
+            #pylint: disable=broad-except
+            except Exception as ex:
+                self.logger.debug('Led8x8FleetCoordinator: publish exception: %s', str(ex))
+
+    def run(self,):
+        """ start the batch thread and make it a daemon """
+        batcher = Thread(target=self.batch_thread)
+        batcher.daemon = True
+        batcher.start()
+
+class Led8x8FleetFollower:
+    """ buffer broadcast frames and show each one at its time stamp """
+
+    def __init__(self, logging_file, display):
+        """ save the HAL used to write frames and create an empty buffer """
+        logging.config.fileConfig(fname=logging_file, disable_existing_loggers=False)
+        # Get the logger specified in the file
+        self.logger = logging.getLogger(__name__)
+        self.display = display
+        self.stamps = []
+        self.frames = []
+        self.lock = Lock()
+        self.arrived = Event()
+        self.skipped_frames = 0
+
+    def on_message(self, payload):
+        """ add a broadcast batch to the buffer in time stamp order """
+        try:
+            frames = decode_batch(payload)
+        except struct.error as ex:
+            self.logger.info('Led8x8FleetFollower: bad batch of %d bytes: %s',
+                             len(payload), str(ex))
+            return
+        with self.lock:
+            for stamp, green, red, mode, state in frames:
+                index = bisect.bisect(self.stamps, stamp)
+                self.stamps.insert(index, stamp)
+                self.frames.insert(index, (green, red, mode, state))
+            if len(self.stamps) > BUFFER_FRAMES:
+                del self.stamps[:-BUFFER_FRAMES]
+                del self.frames[:-BUFFER_FRAMES]
+        self.arrived.set()
+
+    def next_due(self, now):
+        """ remove and return the newest frame due at now and the wait for the one after """
+        frame = None
+        with self.lock:
+            due = bisect.bisect(self.stamps, now)
+            if due > 0:
+                frame = self.frames[due - 1]
+                self.skipped_frames += due - 1
+                del self.stamps[:due]
+                del self.frames[:due]
+            wait = self.stamps[0] - now if self.stamps else IDLE_WAIT
+        return frame, wait
+
+    def follower_thread(self,):
+        """ sleep until the next frame is due and write it to the display """
+        while True:
+            try:
+                self.arrived.clear()
+                frame, wait = self.next_due(time.time())
+                if frame is not None:
+                    self.display.show_frame(*frame)
+                else:
+                    self.display.service_device()
+                self.arrived.wait(max(0.0, min(wait, IDLE_WAIT)))
+            #pylint: disable=broad-except
+            except Exception as ex:
+                self.logger.debug('Led8x8FleetFollower: thread exception: %s', str(ex))
+                time.sleep(IDLE_WAIT)
+
+    def run(self,):
+        """ start the follower thread and make it a daemon """
+        follower = Thread(target=self.follower_thread)
+        follower.daemon = True
+        follower.start()
+
+if __name__ == '__main__':
+    sys.exit()
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+
+""" In memory frame for an Adafruit 8x8 bicolor LED backpack """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A frame is two 64 bit planes, one for the green LEDs and one for the red
+# LEDs. Pixel (x, y) is bit x * 8 + y of each plane and the color value used
+# by the Matrix8x8x2 is red plane bit + 2 * green plane bit.
+
+# Color values of the Matrix8x8x2; adafruit_ht16k33 has LED_RED = 1 and
+# LED_GREEN = 2.
+
+OFF = 0
+RED = 1
+GREEN = 2
+YELLOW = 3
+
+ALL_PIXELS = 0xFFFFFFFFFFFFFFFF
+
+FRAME_BYTES = 16
+
+def frame_to_bytes(green, red):
+    """ pack a frame into the 16 byte wire format """
+    return green.to_bytes(8, 'big') + red.to_bytes(8, 'big')
+
+def bytes_to_frame(payload):
+    """ unpack a 16 byte frame into green and red planes """
+    return int.from_bytes(payload[0:8], 'big'), int.from_bytes(payload[8:16], 'big')
+
+class Led8x8FrameBuffer:
+    """ drop in replacement for the Matrix8x8x2 that keeps the frame in memory """
+
+    def __init__(self,):
+        """ create a blank frame """
+        self.green = 0
+        self.red = 0
+        self.brightness = 1.0
+        self.auto_write = False
+
+    def begin(self,):
+        """ nothing to initialize for an in memory frame """
+
+    def show(self,):
+        """ nothing to write for an in memory frame """
+
+    def fill(self, color):
+        """ set every pixel to the color """
+        self.green = ALL_PIXELS if color & GREEN else 0
+        self.red = ALL_PIXELS if color & RED else 0
+
+    def __setitem__(self, key, color):
+        """ set pixel x, y to the color """
+        xpixel, ypixel = key
+        bit = 1 << (xpixel * 8 + ypixel)
+        if color & GREEN:
+            self.green |= bit
+        else:
+            self.green &= ~bit
+        if color & RED:
+            self.red |= bit
+        else:
+            self.red &= ~bit
+
+    def __getitem__(self, key):
+        """ return the color of pixel x, y """
+        xpixel, ypixel = key
+        shift = xpixel * 8 + ypixel
+        return ((self.red >> shift) & 1) | (((self.green >> shift) & 1) << 1)
+
+    def get_frame(self,):
+        """ return the green and red planes """
+        return self.green, self.red
+
+    def set_frame(self, green, red):
+        """ replace the frame with the green and red planes """
+        self.green = green
+        self.red = red
+
+if __name__ == '__main__':
+    exit()
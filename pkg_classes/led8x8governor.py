@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+
+""" Adapt the display tick rate of an Adafruit 8x8 LED backpack to its content """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The governor counts the pixels that changed in every rendered frame. Each
+# tick that changes nothing doubles the time to the next one, up to
+# STATIC_LIMIT seconds for a still picture or BLANK_LIMIT seconds for a dark
+# display, and the first frame that changes drops back to the pattern's own
+# sleep time. The HAL wakes the display thread early on a state or mode
+# change, so a long tick never delays a new picture.
+
+import sys
+import time
+
+PIXELS = 64
+STATIC_LIMIT = 2.0
+BLANK_LIMIT = 10.0
+MAX_STRETCH = 64
+
+# one changed-pixel update is a single 17 byte HT16K33 write at 100 kHz
+
+I2C_WRITE_SECONDS = 0.0018
+
+def popcount(value):
+    """ number of bits set in a frame plane """
+    return bin(value).count('1')
+
+class Led8x8Governor:
+    """ measure frame changes and choose the next tick time """
+
+    def __init__(self, adaptive=True):
+        """ start at the pattern's own rate with empty statistics """
+        self.adaptive = adaptive
+        self.last_frame = None
+        self.changed = PIXELS
+        self.blank = False
+        self.stretch = 1
+        self.start_time = time.perf_counter()
+        self.ticks = 0
+        self.writes = 0
+        self.busy = 0.0
+
+    def measure(self, green, red, busy):
+        """ record how many pixels changed and how long the tick took """
+        if self.last_frame is None:
+            self.changed = PIXELS
+        else:
+            self.changed = popcount((green ^ self.last_frame[0]) | (red ^ self.last_frame[1]))
+        self.last_frame = (green, red)
+        self.blank = (green | red) == 0
+        self.ticks += 1
+        self.busy += busy
+        if self.changed:
+            self.writes += 1
+            self.stretch = 1
+        else:
+            self.stretch = min(self.stretch * 2, MAX_STRETCH)
+
+    def wake(self,):
+        """ a state or mode change; go back to the pattern's own rate """
+        self.stretch = 1
+
+    def tick_time(self, sleep_time):
+        """ seconds to wait before rendering the next frame """
+        if not self.adaptive or self.stretch == 1:
+            return sleep_time
+        limit = BLANK_LIMIT if self.blank else STATIC_LIMIT
+        return min(sleep_time * self.stretch, max(limit, sleep_time))
+
+    def get_stats(self,):
+        """ tick rate, duty cycle and estimated CPU and I2C bus utilisation """
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            'ticks': self.ticks,
+            'writes': self.writes,
+            'changed': self.changed,
+            'stretch': self.stretch,
+            'tick_rate': self.ticks / elapsed if elapsed > 0 else 0.0,
+            'duty_cycle': self.writes / self.ticks if self.ticks else 0.0,
+            'cpu': self.busy / elapsed if elapsed > 0 else 0.0,
+            'bus': self.writes * I2C_WRITE_SECONDS / elapsed if elapsed > 0 else 0.0,
+        }
+
+if __name__ == '__main__':
+    sys.exit()
@@ -26,31 +26,25 @@
 
 import sys
 import time
-from threading import Thread
+from threading import Thread, Event
 import logging
 import logging.config
 
-import board
-import busio
+from .led8x8pattern import PATTERN_DISPATCH_DICTIONARY, ALERT_MODES, demo_modes
+from .led8x8pattern import load_patterns, create_pattern
+from .led8x8writer import Led8x8Writer
+from .led8x8dither import Led8x8Dither, levels_to_planes
+from .led8x8governor import Led8x8Governor
 
-# Import the HT16K33 LED matrix module.
+# Color values and display modes as convenient globals.
 
-from adafruit_ht16k33 import matrix
+from .led8x8pattern import OFF, GREEN, RED, YELLOW
+from .led8x8pattern import FIRE_MODE, PANIC_MODE, FIBONACCI_MODE, WOPR_MODE, LIFE_MODE
+from .led8x8pattern import IDLE_MODE
 
-# import the display applications
+# import the display applications; each one registers itself for its mode
 
-from .led8x8idle import Led8x8Idle
-from .led8x8flash import Led8x8Flash
-from .led8x8fibonacci import Led8x8Fibonacci
-from .led8x8wopr import Led8x8Wopr
-from .led8x8life import Led8x8Life
-
-# Color values as convenient globals.
-
-OFF = 0
-GREEN = 1
-RED = 2
-YELLOW = 3
+load_patterns()
 
 # state machine modes
 
@@ -58,16 +52,6 @@ IDLE_STATE = 0
 DEMO_STATE = 1
 SECURITY_STATE = 2
 
-# display modes
-
-FIRE_MODE = 0
-PANIC_MODE = 1
-FIBONACCI_MODE = 2
-WOPR_MODE = 3
-LIFE_MODE = 4
-
-SLEEP_TIME = [ 0.2, 0.2, 0.2, 0.2, 0.5 ]
-
 class ModeController:
     """ control changing modes. note Fire and Panic are externally controlled. """
 
@@ -106,34 +90,43 @@ class ModeController:
         now_time = time.time()
         elapsed = now_time - self.start_time
         if elapsed > 60:
+            modes = demo_modes()
             self.last_mode = self.current_mode
-            self.current_mode = self.current_mode + 1
+            self.current_mode = modes[0]
             self.start_time = now_time
-            if self.current_mode > LIFE_MODE:
-                self.current_mode = FIBONACCI_MODE
+            for mode in modes:
+                if mode > self.last_mode:
+                    self.current_mode = mode
+                    break
 #pylint: disable=too-many-instance-attributes
 
 class Led8x8HAL:
     """ Idle or sleep pattern """
 
-    def __init__(self, logging_file):
+    #pylint: disable=too-many-arguments
+    def __init__(self, logging_file, simulate=False, dither=False, adaptive=False,
+                 options=None):
         """ create initial conditions and saving display and I2C lock """
         logging.config.fileConfig(fname=logging_file, disable_existing_loggers=False)
         # Get the logger specified in the file
         self.logger = logging.getLogger(__name__)
-        # Create the I2C interface.
-        i2c = busio.I2C(board.SCL, board.SDA)
-        # Create the matrix class.
-        self.matrix8x8 = matrix.Matrix8x8x2(i2c,auto_write=True)
-        self.matrix8x8.fill(0)
+        # The writer owns the I2C bus, or an in memory stand-in for testing.
+        self.writer = Led8x8Writer(logging_file, simulate)
+        # temporal dithering for patterns that render intensity levels
+        self.dither = Led8x8Dither() if dither else None
+        # slow the tick down while nothing changes; set wakes it on any change
+        self.governor = Led8x8Governor(adaptive)
+        self.wake = Event()
+        self.last_frame = (0, 0)
+        self.frame_listeners = []
+        self.render_listeners = []
+        self.device_output = True
         self.mode_controller = ModeController()
-        self.idle = Led8x8Idle(self.matrix8x8)
-        self.fire = Led8x8Flash(self.matrix8x8, RED)
-        self.panic = Led8x8Flash(self.matrix8x8, YELLOW)
-        self.fib = Led8x8Fibonacci(self.matrix8x8)
-        self.wopr = Led8x8Wopr(self.matrix8x8)
-        self.life = Led8x8Life(self.matrix8x8)
-        self.error_count = 0
+        # one instance of every registered pattern with the display options it
+        # takes, e.g. {'universe': 64} for Life
+        self.patterns = {}
+        for mode in PATTERN_DISPATCH_DICTIONARY:
+            self.patterns[mode] = create_pattern(mode, options or {})
 
     def reset(self,):
         """ initialize to starting state and set brightness """
@@ -142,61 +135,152 @@ class Led8x8HAL:
 
     def display_thread(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
+        render_time = 0.0
         while True:
             try:
                 mode = self.mode_controller.get_mode()
-                time.sleep(SLEEP_TIME[mode])
-                if mode == FIRE_MODE:
-                    self.fire.update()
-                elif mode == PANIC_MODE:
-                    self.panic.update()
-                else:
-                    state = self.mode_controller.get_state()
-                    if state == SECURITY_STATE:
-                        self.matrix8x8.fill(0)
-                    elif state == IDLE_STATE:
-                        time.sleep(0.5)
-                        self.idle.update()
-                    else: #demo
-                        if mode == FIBONACCI_MODE:
-                            self.fib.update()
-                        elif mode == WOPR_MODE:
-                            self.wopr.update()
-                        elif mode == LIFE_MODE:
-                            self.life.update()
-                        self.mode_controller.evaluate()
+                entry = PATTERN_DISPATCH_DICTIONARY[mode]
+                state = self.mode_controller.get_state()
+                dithered = (self.dither is not None and entry["levels"] and
+                            state == DEMO_STATE and self.device_output)
+                sleep_time = entry["sleep"]
+                if state == IDLE_STATE and mode not in ALERT_MODES:
+                    sleep_time += PATTERN_DISPATCH_DICTIONARY[IDLE_MODE]["sleep"]
+                tick_time = sleep_time if dithered else self.governor.tick_time(sleep_time)
+                # a state or mode change cuts a stretched tick short, but renders
+                # are always at least the pattern's own sleep time apart
+                if self.wake.wait(max(0.0, render_time + tick_time - time.monotonic())):
+                    self.wake.clear()
+                    self.governor.wake()
+                    continue
+                render_time = time.monotonic()
+                if dithered:
+                    self.dither_tick(mode, entry["sleep"])
+                    continue
+                begin = time.perf_counter()
+                if mode in ALERT_MODES:
+                    green, red = self.patterns[mode].render()
+                elif state == SECURITY_STATE:
+                    green, red = 0, 0
+                elif state == IDLE_STATE:
+                    green, red = self.patterns[IDLE_MODE].render()
+                else: #demo
+                    green, red = self.patterns[mode].render()
+                    self.mode_controller.evaluate()
+                self.flush(green, red)
+                self.governor.measure(green, red, time.perf_counter() - begin)
             #pylint: disable=broad-except
             except Exception as ex:
-                self.logger.debug('Led8x8Controller: thread exception: %s %s', str(ex),
-                            str(self.error_count))
-                print("led8x8 exception")
-                self.error_count += 1
-                if self.error_count < 10:
-                    time.sleep(1.0)
-                    self.matrix8x8.begin()
-                else:
-                    break
+                # I2C errors are handled by the writer; keep rendering after anything else
+                self.logger.debug('Led8x8Controller: thread exception: %s', str(ex))
+                time.sleep(1.0)
+
+    def dither_tick(self, mode, duration):
+        """ show one intensity frame as dithered sub-frames for the tick """
+        green_levels, red_levels = self.patterns[mode].render_levels()
+        self.mode_controller.evaluate()
+        self.dither.set_levels(green_levels, red_levels)
+        # listeners see the nearest two color frame rather than every sub-frame
+        green, red = levels_to_planes(green_levels, red_levels)
+        self.notify(green, red, self.render_listeners)
+        self.notify(green, red)
+        self.last_frame = None
+        # the tick always runs to the end, a state or mode change set during it
+        # is picked up by the next render
+        self.dither.run(self.writer.write, duration)
+
+    #pylint: disable=too-many-arguments
+    def notify(self, green, red, listeners=None, mode=None, state=None):
+        """ pass a frame to the frame listeners, or to the listeners given, with
+            the current mode and state unless the frame brings its own
+        """
+        if mode is None:
+            mode = self.mode_controller.get_mode()
+        if state is None:
+            state = self.mode_controller.get_state()
+        if listeners is None:
+            listeners = self.frame_listeners
+        for listener in listeners:
+            listener(green, red, mode, state)
+
+    def get_dither_stats(self,):
+        """ sub-frames written, overruns, refresh and flicker rates of the dithering engine """
+        if self.dither is None:
+            return None
+        return self.dither.get_stats()
+
+    def get_power_stats(self,):
+        """ tick rate, duty cycle and estimated CPU and I2C utilisation """
+        return self.governor.get_stats()
+
+    def flush(self, green, red):
+        """ write the rendered frame if it changed and pass it to the frame listeners """
+        frame = (green, red)
+        if frame == self.last_frame:
+            if self.device_output:
+                self.writer.service()
+            return
+        self.last_frame = frame
+        self.notify(green, red, self.render_listeners)
+        if self.device_output:
+            self.writer.write(green, red)
+            self.notify(green, red)
+
+    def add_frame_listener(self, listener):
+        """ call listener(green, red, mode, state) for every frame shown on the display """
+        self.frame_listeners.append(listener)
+
+    def add_render_listener(self, listener):
+        """ call listener(green, red, mode, state) for every frame rendered, shown or not """
+        self.render_listeners.append(listener)
+
+    def set_device_output(self, enabled):
+        """ render frames without writing them to the LED backpack when disabled """
+        self.device_output = enabled
+
+    def show_frame(self, green, red, mode, state):
+        """ write a frame rendered elsewhere, e.g. by a fleet coordinator, in
+            the mode and state it was rendered in
+        """
+        self.writer.write(green, red)
+        self.notify(green, red, mode=mode, state=state)
+
+    def service_device(self,):
+        """ retry a frame that could not be written during an I2C outage """
+        self.writer.service()
+
+    def get_metrics(self,):
+        """ display availability, I2C error and recovery metrics """
+        return self.writer.get_metrics()
 
     def set_mode(self, mode, override=False):
         """ set display mode """
+        previous_mode = self.mode_controller.get_mode()
         if override:
             self.mode_controller.set_mode(mode)
         current_mode = self.mode_controller.get_mode()
-        if current_mode in (FIRE_MODE, PANIC_MODE):
-            return
-        self.mode_controller.set_mode(mode)
+        if current_mode not in ALERT_MODES:
+            self.mode_controller.set_mode(mode)
+        if self.mode_controller.get_mode() != previous_mode:
+            self.wake.set()
 
     def restore_mode(self,):
         """ return to last mode; usually after idle, fire or panic """
+        previous_mode = self.mode_controller.get_mode()
         self.mode_controller.restore_mode()
+        if self.mode_controller.get_mode() != previous_mode:
+            self.wake.set()
 
     def set_state(self, state):
         """ set the machine state """
+        previous_state = self.mode_controller.get_state()
         self.mode_controller.set_state(state)
         if state == IDLE_STATE:
-            self.matrix8x8.brightness = 0.1
+            self.writer.set_brightness(0.1)
         else:
-            self.matrix8x8.brightness = 1.0
+            self.writer.set_brightness(1.0)
+        if state != previous_state:
+            self.wake.set()
 
     def get_state(self,):
         """ get the current machine state """
@@ -1,14 +1,15 @@
 #!/usr/bin/python3
 """ Display full screen flash color pattern on an Adafruit 8x8 LED backpack """
 
-GREEN = 2
+from .led8x8pattern import Led8x8Pattern, register_pattern, IDLE_MODE
 
-class Led8x8Idle:
+class Led8x8Idle(Led8x8Pattern):
     """ Idle or sleep pattern """
 
-    def __init__(self, matrix8x8x2):
-        """ create initial conditions and saving display and I2C lock """
-        self.matrix = matrix8x8x2
+    __slots__ = ('lastx', 'lasty')
+
+    def __init__(self,):
+        """ create initial conditions """
         self.lastx = 0
         self.lasty = 0
 
@@ -16,19 +17,21 @@ class Led8x8Idle:
         """ initialize to starting state and set brightness """
         self.lastx = 0
         self.lasty = 0
-        self.matrix.fill(0)
 
-    def update(self,):
-        """ display the series as a 64 bit image with alternating colored pixels """
-        self.matrix.fill(0)
-        self.matrix[self.lastx, self.lasty] = GREEN
+    def render(self,):
+        """ light one green pixel stepping through the display """
+        pixel = 1 << (self.lastx * 8 + self.lasty)
         self.lasty += 1
         if self.lasty > 7:
             self.lasty = 0
             self.lastx += 1
             if self.lastx > 7:
                 self.lastx = 0
+        return pixel, 0
+
+# the idle state sleeps this long on top of the current mode's sleep time
+
+register_pattern(IDLE_MODE, Led8x8Idle, 0.5)
 
 if __name__ == '__main__':
     exit()
-
@@ -3,170 +3,171 @@
 
 import time
 
+from .led8x8pattern import Led8x8Pattern, register_pattern, LIFE_MODE
+from .led8x8lifeseeds import SEED_FILE, MAX_GENERATIONS, load_seeds, search, step
+from .led8x8universe import Led8x8Universe, VIEW
+
 PATTERN_RATE = 10
 
-BLACK = 0
-GREEN = 1
-RED = 2
-YELLOW = 3
+# seeds from the library run until they settle and show their cycle twice
+
+MIN_GENERATIONS = 20
+RUNTIME_SOUPS = 128
+RUNTIME_SEEDS = 8
+
+# a large universe starts a new soup when it settles or after this many generations
+
+UNIVERSE_GENERATIONS = 2000
+
+# hand-written seeds used when the library is empty; cell x, y is bit x * 8 + y
 
-class Led8x8Life:
+GLIDER = 0x00000000000E0804
+OSCILATOR1 = 0x000000003E000000
+OSCILATOR2 = 0x000000007E000000
+OSCILATOR3 = 0x00604008180000E0
+TOAD = 0x0070000412120800
+
+CLASSIC_SEEDS = (GLIDER, OSCILATOR1, OSCILATOR2, OSCILATOR3, TOAD)
+
+# dithered green and red levels by generations survived, 0 to 4
+
+AGE_GREEN = (255, 223, 186, 136, 0)
+AGE_RED = (0, 136, 186, 223, 255)
+
+class Led8x8Life(Led8x8Pattern):
     """ Game of Life pattern based on john Conway """
 
-    def __init__(self, matrix8x8x2):
-        """ create initial conditions and saving display and I2C lock """
-        self.matrix = matrix8x8x2
-        self.current_gen = [[0 for x in range(8)] for y in range(8)]
-        self.next_gen = [[0 for x in range(8)] for y in range(8)]
+    # alive is the board; age0, age1 and age2 count the generations each cell
+    # has survived, saturating at 4, one bit plane per counter bit. With a
+    # universe larger than 8x8 the planes cover the whole universe and the
+    # display shows its viewport.
+
+    __slots__ = ('alive', 'age0', 'age1', 'age2', 'pattern', 'pattern_switch_time',
+                 'seeds', 'seed_index', 'generation', 'generation_limit', 'universe')
+
+    def __init__(self, seed_file=SEED_FILE, size=VIEW):
+        """ create initial conditions and load the seed library """
+        self.universe = Led8x8Universe(size) if size > VIEW else None
+        self.alive = 0
+        self.age0 = 0
+        self.age1 = 0
+        self.age2 = 0
         self.pattern = 0
         self.pattern_switch_time = time.time()
-        self.dispatch = {
-            0: self.glider,
-            1: self.oscilator1,
-            2: self.oscilator1,
-            3: self.oscilator2,
-            4: self.oscilator3,
-            5: self.toad
-        }
-
-    def glider(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 1, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 1, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 1, 1, 1, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[4] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
-
-    def oscilator1(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 1, 1, 1, 1, 1, 0, 0]
-        self.next_gen[4] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
-
-    def oscilator2(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 1, 1, 1, 1, 1, 1, 0]
-        self.next_gen[4] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
-
-    def oscilator3(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 1, 1, 1]
-        self.next_gen[1] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 0, 0, 1, 1, 0, 0, 0]
-        self.next_gen[4] = [0, 0, 0, 1, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 1, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 1, 1, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
-
-    def toad(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 1, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 1, 0, 0, 1, 0, 0, 0]
-        self.next_gen[3] = [0, 1, 0, 0, 1, 0, 0, 0]
-        self.next_gen[4] = [0, 0, 1, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 1, 1, 1, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
+        # long lived seeds from the library or, without one, a small runtime
+        # search; a large universe starts from random soups instead
+        self.seeds = []
+        if self.universe is None:
+            try:
+                self.seeds = load_seeds(seed_file)
+            except OSError:
+                self.seeds = search(RUNTIME_SOUPS, RUNTIME_SEEDS, processes=1)
+        self.seed_index = 0
+        self.generation = 0
+        self.generation_limit = MAX_GENERATIONS
+
+    def seed(self, board):
+        """ initialize to a packed 64 bit board with cell x, y at bit x * 8 + y """
+        self.alive = board
+        self.age0 = 0
+        self.age1 = 0
+        self.age2 = 0
 
     def spawn(self,):
         """ initialize to starting state and set brightness """
-        self.dispatch[self.pattern]()
         self.pattern_switch_time = time.time()
+        self.generation = 0
+        if self.universe is not None:
+            self.generation_limit = UNIVERSE_GENERATIONS
+            self.seed(self.universe.soup())
+            return
+        if self.seeds:
+            board, transient, period = self.seeds[self.seed_index]
+            self.generation_limit = min(max(transient + 2 * period, MIN_GENERATIONS),
+                                        MAX_GENERATIONS)
+            self.seed_index += 1
+            if self.seed_index >= len(self.seeds):
+                self.seed_index = 0
+            self.seed(board)
+            return
+        self.seed(CLASSIC_SEEDS[self.pattern])
         self.pattern += 1
-        if self.pattern > 5:
+        if self.pattern >= len(CLASSIC_SEEDS):
             self.pattern = 0
 
     def reset(self,):
         """ initialize to starting state and set brightness """
         self.spawn()
 
-    @classmethod
-    def mod(cls, test):
-        """ ensure that the returned coordinate is between 0 and 7 """
-        safe = (test + 8) % 8
-        return safe
-
-    def draw(self,):
-        """ display a section of WOPR based on starting and ending rows """
-        self.matrix.fill(0)
-        for xpixel in range(8):
-            for ypixel in range(8):
-                color = BLACK
-                if self.next_gen[xpixel][ypixel] >= 5:
-                    color = RED
-                elif self.next_gen[xpixel][ypixel] == 1:
-                    color = GREEN
-                elif self.next_gen[xpixel][ypixel] != 0:
-                    color = YELLOW
-                if color > BLACK:
-                    self.matrix[xpixel, ypixel] = color
-
     def age(self,):
-        """ ensure that the returned coordinate is between 0 and 7 """
-        for i in range(8):
-            for j in range(8):
-                alive = 0
-                alive += self.current_gen[self.mod(i+1)][self.mod(j)] != 0
-                alive += self.current_gen[self.mod(i)][self.mod(j+1)] != 0
-                alive += self.current_gen[self.mod(i-1)][self.mod(j)] != 0
-                alive += self.current_gen[self.mod(i)][self.mod(j-1)] != 0
-                alive += self.current_gen[self.mod(i+1)][self.mod(j+1)] != 0
-                alive += self.current_gen[self.mod(i-1)][self.mod(j-1)] != 0
-                alive += self.current_gen[self.mod(i+1)][self.mod(j-1)] != 0
-                alive += self.current_gen[self.mod(i-1)][self.mod(j+1)] != 0
-                if self.current_gen[i][j] != 0:
-                    if (alive < 2) or (alive > 3):
-                        self.next_gen[i][j] = 0
-                    else:
-                        self.next_gen[i][j] = self.current_gen[i][j] + 1
-                else:
-                    if alive == 3:
-                        self.next_gen[i][j] = 1
-
-    def copy(self,):
-        """ ensure that the returned coordinate is between 0 and 7 """
-        early_spawn = True
-        for i in range(8):
-            for j in range(8):
-                self.current_gen[i][j] = self.next_gen[i][j]
-                if early_spawn:
-                    if self.current_gen[i][j] != 0:
-                        early_spawn = False
-        if early_spawn:
-            self.matrix.fill(0)
+        """ advance one generation; survivors age and newborn cells start at zero """
+        if self.universe is not None:
+            survivors = self.universe.step(self.alive)
+        else:
+            survivors = step(self.alive)
+        born = survivors & ~self.alive
+        survivors &= self.alive
+        increment = survivors & ~self.age2
+        carry = self.age0 & increment
+        self.age0 = (self.age0 ^ increment) & survivors
+        self.age2 = (self.age2 | (self.age1 & carry)) & survivors
+        self.age1 = (self.age1 ^ carry) & survivors
+        self.alive = survivors | born
+
+    def advance(self,):
+        """ age one generation and spawn a new seed when this one has run its course """
+        before = self.alive
+        self.age()
+        self.generation += 1
+        if self.universe is not None:
+            if (not self.universe.update(before, self.alive) or
+                    self.generation > self.generation_limit):
+                self.spawn()
+        elif self.seeds:
+            if self.generation > self.generation_limit:
+                self.spawn()
+        elif time.time() - self.pattern_switch_time > PATTERN_RATE:
             self.spawn()
 
-    def update(self,):
-        """ display the series as a 64 bit image with alternating colored pixels """
-        self.draw()
-        self.age()
-        self.copy()
-        now_time = time.time()
-        elapsed = now_time - self.pattern_switch_time
-        if elapsed > PATTERN_RATE:
+    def view(self,):
+        """ the alive and age planes of the cells on the display """
+        if self.universe is None:
+            return self.alive, self.age0, self.age1, self.age2
+        window = self.universe.window
+        return window(self.alive), window(self.age0), window(self.age1), window(self.age2)
+
+    def render(self,):
+        """ newborn cells are green, survivors yellow and cells older than four red """
+        if self.alive == 0:
             self.spawn()
+        alive, age0, age1, age2 = self.view()
+        green = alive & ~age2
+        red = alive & (age0 | age1 | age2)
+        self.advance()
+        return green, red
+
+    def render_levels(self,):
+        """ fade each cell from green through yellow to red as it ages """
+        if self.alive == 0:
+            self.spawn()
+        green = [0] * 64
+        red = [0] * 64
+        alive, age0, age1, age2 = self.view()
+        while alive:
+            bit = alive & -alive
+            pixel = bit.bit_length() - 1
+            age = (((age0 >> pixel) & 1) | (((age1 >> pixel) & 1) << 1) |
+                   (((age2 >> pixel) & 1) << 2))
+            green[pixel] = AGE_GREEN[age]
+            red[pixel] = AGE_RED[age]
+            alive ^= bit
+        self.advance()
+        return green, red
+
+# the universe display option sets the size of the Life universe
+
+register_pattern(LIFE_MODE, lambda universe=VIEW: Led8x8Life(size=universe), 0.5,
+                 demo=True, levels=True, options=('universe',))
 
 if __name__ == '__main__':
     exit()
-
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+
+""" Search random 8x8 toroidal soups for long lived Game of Life seeds """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A board is packed into a 64 bit integer with cell (x, y) at bit x * 8 + y,
+# the same layout as the frame planes. One generation is a handful of shifts
+# and bitwise adds, so a soup is simulated without touching individual cells.
+# Each seed in the library is stored as one line: seed transient period.
+# Soups that have not repeated within SEARCH_GENERATIONS are unresolved,
+# period 0, and are left out of the library.
+
+import os
+import sys
+import random
+from multiprocessing import Pool
+
+BOARD_MASK = 0xFFFFFFFFFFFFFFFF
+LOW_BIT_MASK = 0x0101010101010101
+HIGH_BIT_MASK = 0x8080808080808080
+
+SEARCH_GENERATIONS = 1024
+
+# a resolved seed repeats within SEARCH_GENERATIONS, so transient + period
+# is at most SEARCH_GENERATIONS and showing its cycle twice always fits
+
+MAX_GENERATIONS = 2 * SEARCH_GENERATIONS
+
+SEED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'life_seeds.txt')
+
+def step(board):
+    """ advance a packed 8x8 toroidal board by one generation """
+    north = ((board << 8) | (board >> 56)) & BOARD_MASK
+    south = ((board >> 8) | (board << 56)) & BOARD_MASK
+    sum0 = 0
+    sum1 = 0
+    sum2 = 0
+    for index, row in enumerate((north, board, south)):
+        east = ((row >> 1) & ~HIGH_BIT_MASK) | ((row << 7) & HIGH_BIT_MASK)
+        west = ((row << 1) & ~LOW_BIT_MASK) | ((row >> 7) & LOW_BIT_MASK)
+        # the cell itself is not one of its neighbors
+        neighbors = (east, west) if index == 1 else (row, east, west)
+        for cell in neighbors:
+            carry0 = sum0 & cell
+            sum0 ^= cell
+            carry1 = sum1 & carry0
+            sum1 ^= carry0
+            sum2 ^= carry1
+    # two or three neighbors keep a live cell, exactly three create one
+    return sum1 & ~sum2 & (sum0 | board) & BOARD_MASK
+
+def evaluate(seed, limit=SEARCH_GENERATIONS):
+    """ return the transient length and period of the cycle a seed falls into,
+        period 0 when it has not repeated within limit generations
+    """
+    seen = {}
+    board = seed
+    for generation in range(limit):
+        if board in seen:
+            return seen[board], generation - seen[board]
+        seen[board] = generation
+        board = step(board)
+    return limit, 0
+
+def rank_soups(soups):
+    """ simulate a batch of soups and return (transient, period, seed) best first """
+    ranked = []
+    for seed in soups:
+        # long transients first, then soups that settle into the longest cycle
+        transient, period = evaluate(seed)
+        if period:
+            ranked.append((transient, period, seed))
+    ranked.sort(reverse=True)
+    return ranked
+
+def random_soups(count, rng=random):
+    """ return count random 8x8 soups with roughly half of the cells alive """
+    return [rng.getrandbits(64) for _ in range(count)]
+
+def search(soup_count, seed_count, processes=None, batch_size=1024):
+    """ rank soup_count random soups across a process pool and return the best seeds """
+    batches = [random_soups(min(batch_size, soup_count - start))
+               for start in range(0, soup_count, batch_size)]
+    if processes == 1 or len(batches) == 1:
+        results = [rank_soups(batch) for batch in batches]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(rank_soups, batches)
+    ranked = sorted((entry for batch in results for entry in batch[:seed_count]),
+                    reverse=True)
+    best = []
+    chosen = set()
+    for transient, period, seed in ranked:
+        if seed not in chosen:
+            chosen.add(seed)
+            best.append((seed, transient, period))
+        if len(best) >= seed_count:
+            break
+    return best
+
+def save_seeds(seeds, path=SEED_FILE):
+    """ write (seed, transient, period) entries to the seed library """
+    with open(path, 'w') as library:
+        library.write('# seed transient period\n')
+        for seed, transient, period in seeds:
+            library.write('{:016x} {} {}\n'.format(seed, transient, period))
+
+def load_seeds(path=SEED_FILE):
+    """ read (seed, transient, period) entries from the seed library """
+    seeds = []
+    with open(path) as library:
+        for line in library:
+            fields = line.split()
+            if len(fields) != 3 or fields[0].startswith('#') or fields[2] == '0':
+                continue
+            seeds.append((int(fields[0], 16), int(fields[1]), int(fields[2])))
+    return seeds
+
+if __name__ == '__main__':
+    sys.exit()
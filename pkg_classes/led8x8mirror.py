@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+
+""" Mirror the frames shown on an Adafruit 8x8 LED backpack to an MQTT topic """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The payload is the 16 byte frame of led8x8framebuffer, the green plane then
+# the red plane, big endian, pixel (x, y) at bit x * 8 + y. It is published
+# retained so a new subscriber sees the current picture at once.
+#
+# The display thread only replaces the newest frame; the mirror thread
+# publishes at most one frame every MIRROR_INTERVAL seconds, so frames that
+# arrive in between are coalesced and a slow broker never stalls rendering.
+
+import sys
+import time
+from threading import Thread, Lock, Event
+import logging
+import logging.config
+
+from .led8x8framebuffer import frame_to_bytes
+
+MIRROR_TOPIC = '/matrix/frame/state'
+MIRROR_INTERVAL = 1.0
+
+# paho.mqtt.client.MQTT_ERR_SUCCESS, the rc of a publish that was sent
+
+MQTT_ERR_SUCCESS = 0
+
+class Led8x8Mirror:
+    """ HAL frame listener publishing the newest frame, rate limited and retained """
+
+    def __init__(self, logging_file, client, location, interval=MIRROR_INTERVAL):
+        """ save the MQTT client and the topic under the location """
+        logging.config.fileConfig(fname=logging_file, disable_existing_loggers=False)
+        # Get the logger specified in the file
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.topic = location + MIRROR_TOPIC
+        self.interval = interval
+        self.frame = None
+        self.published = None
+        self.publish_time = 0.0
+        self.lock = Lock()
+        self.ready = Event()
+        self.frames = 0
+        self.publishes = 0
+
+    def on_frame(self, green, red, mode, state):
+        """ HAL frame listener; keep only the newest frame """
+        #pylint: disable=unused-argument
+        with self.lock:
+            self.frame = (green, red)
+            self.frames += 1
+        self.ready.set()
+
+    def republish(self,):
+        """ publish the current frame again, e.g. after reconnecting to the broker """
+        with self.lock:
+            self.published = None
+        self.ready.set()
+
+    def mirror_thread(self,):
+        """ publish the newest frame when it differs from the last one published """
+        while True:
+            self.ready.wait()
+            self.ready.clear()
+            delay = self.publish_time + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self.lock:
+                frame = self.frame
+                if frame is None or frame == self.published:
+                    continue
+            self.publish_time = time.monotonic()
+            try:
+                info = self.client.publish(self.topic, frame_to_bytes(*frame), 0, True)
+            #pylint: disable=broad-except
+            except Exception as ex:
+                self.logger.debug('Led8x8Mirror: publish exception: %s', str(ex))
+                continue
+            if info.rc != MQTT_ERR_SUCCESS:
+                # not connected; republish() sends the newest frame on connect
+                self.logger.debug('Led8x8Mirror: publish failed rc %d', info.rc)
+                continue
+            with self.lock:
+                self.published = frame
+            self.publishes += 1
+
+    def get_stats(self,):
+        """ frames seen and frames published """
+        return {'frames': self.frames, 'publishes': self.publishes}
+
+    def run(self,):
+        """ start the mirror thread and make it a daemon """
+        mirror = Thread(target=self.mirror_thread)
+        mirror.daemon = True
+        mirror.start()
+
+if __name__ == '__main__':
+    sys.exit()
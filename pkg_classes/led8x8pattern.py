@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+
+""" Common base class and registry for Adafruit 8x8 LED backpack patterns """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A pattern renders a frame as two 64 bit planes, green and red, with pixel
+# (x, y) at bit x * 8 + y. Each pattern module registers itself against a
+# display mode; load_patterns imports every led8x8 module of the package, so
+# a new pattern module plugs in without an edit elsewhere. Led8x8HAL builds
+# one instance of every registered pattern, passing it the display options
+# it asked for, and dispatches through PATTERN_DISPATCH_DICTIONARY.
+
+import os
+import sys
+import pkgutil
+import importlib
+
+from .led8x8framebuffer import ALL_PIXELS
+from .led8x8dither import planes_to_levels
+
+# Color values of the Matrix8x8x2: red plane bit + 2 * green plane bit.
+
+#pylint: disable=unused-import
+from .led8x8framebuffer import OFF, RED, GREEN, YELLOW
+
+# display modes
+
+FIRE_MODE = 0
+PANIC_MODE = 1
+FIBONACCI_MODE = 2
+WOPR_MODE = 3
+LIFE_MODE = 4
+IDLE_MODE = 5
+
+# fire and panic are shown whatever the machine state
+
+ALERT_MODES = (FIRE_MODE, PANIC_MODE)
+
+PATTERN_DISPATCH_DICTIONARY = {}
+
+#pylint: disable=too-many-arguments
+
+def register_pattern(mode, factory, sleep_time, demo=False, levels=False, options=()):
+    """ register a pattern factory for a display mode; demo patterns take
+        turns in the demo rotation, levels patterns are dithered when
+        dithering is enabled and options names the keyword arguments the
+        factory takes from the display options
+    """
+    PATTERN_DISPATCH_DICTIONARY[mode] = {
+        "factory": factory,
+        "sleep": sleep_time,
+        "demo": demo,
+        "levels": levels,
+        "options": options,
+    }
+
+def load_patterns():
+    """ import every led8x8 module of the package so its patterns register """
+    package = __name__.rpartition('.')[0]
+    for module in pkgutil.iter_modules([os.path.dirname(os.path.abspath(__file__))]):
+        if module.name.startswith('led8x8'):
+            importlib.import_module(package + '.' + module.name)
+
+def create_pattern(mode, options):
+    """ build the pattern registered for a mode with the options it takes """
+    entry = PATTERN_DISPATCH_DICTIONARY[mode]
+    kwargs = {name: options[name] for name in entry["options"] if name in options}
+    return entry["factory"](**kwargs)
+
+def demo_modes():
+    """ the registered demo modes in rotation order """
+    return sorted(mode for mode, entry in PATTERN_DISPATCH_DICTIONARY.items() if entry["demo"])
+
+def color_planes(color):
+    """ return the green and red planes of a whole frame of one color """
+    return (ALL_PIXELS if color & GREEN else 0), (ALL_PIXELS if color & RED else 0)
+
+class Led8x8Pattern:
+    """ base class of the display patterns """
+
+    __slots__ = ()
+
+    def reset(self,):
+        """ return to the starting state """
+
+    def render(self,):
+        """ advance one tick and return the frame as green and red planes """
+        return 0, 0
+
+    def render_levels(self,):
+        """ advance one tick and return the frame as green and red intensity levels """
+        return planes_to_levels(*self.render())
+
+if __name__ == '__main__':
+    sys.exit()
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+
+""" Record and replay the frames written to an Adafruit 8x8 LED backpack """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The capture is a ring of two segment files, <path>.0 and <path>.1. When the
+# current segment is full the older one is truncated and becomes current, so
+# disk use never exceeds capture_bytes. A segment starts with MAGIC and a key
+# record, and every record after that is a delta from the one before it.
+#
+#   key record:   KEY_RECORD, monotonic time (double), mode << 4 | state,
+#                 16 frame bytes
+#   delta record: DELTA_RECORD, varint milliseconds since the last record,
+#                 mode << 4 | state, 16 bit mask of the frame bytes that
+#                 changed, then those bytes XOR their previous values
+#
+# The display thread only appends a tuple to a deque; encoding and disk
+# writes happen on the recorder thread.
+
+import os
+import sys
+import time
+import struct
+from collections import deque
+from threading import Thread, Event
+import logging
+import logging.config
+
+from .led8x8framebuffer import frame_to_bytes, bytes_to_frame
+
+MAGIC = b'L8x8\x01'
+KEY_RECORD = 0x4B
+DELTA_RECORD = 0x44
+
+CAPTURE_BYTES = 1024 * 1024
+QUEUE_FRAMES = 1024
+MAX_REPLAY_GAP = 5.0
+
+def encode_varint(value):
+    """ LEB128 encode an unsigned integer """
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+def decode_varint(data, position):
+    """ decode a LEB128 integer returning the value and the next position """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+def segment_paths(path):
+    """ the two segment files of a capture """
+    return [path + '.0', path + '.1']
+
+class Led8x8Recorder:
+    """ HAL frame listener writing a delta encoded ring capture """
+
+    def __init__(self, logging_file, path, capture_bytes=CAPTURE_BYTES):
+        """ pick the older segment to overwrite and create the frame queue """
+        logging.config.fileConfig(fname=logging_file, disable_existing_loggers=False)
+        # Get the logger specified in the file
+        self.logger = logging.getLogger(__name__)
+        self.paths = segment_paths(path)
+        self.segment_bytes = capture_bytes // 2
+        self.queue = deque(maxlen=QUEUE_FRAMES)
+        self.ready = Event()
+        self.file = None
+        self.size = 0
+        self.last = None
+        self.last_time = 0.0
+        # keep the newest segment from the previous run
+        ages = [os.path.getmtime(name) if os.path.exists(name) else 0.0
+                for name in self.paths]
+        self.segment = 0 if ages[0] <= ages[1] else 1
+
+    def on_frame(self, green, red, mode, state):
+        """ HAL frame listener; cheap enough for the display thread """
+        self.queue.append((time.monotonic(), green, red, mode, state))
+        self.ready.set()
+
+    def open_segment(self,):
+        """ truncate the current segment and start it with the header """
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.paths[self.segment], 'wb')
+        self.file.write(MAGIC)
+        self.size = len(MAGIC)
+        self.last = None
+
+    def encode(self, stamp, green, red, mode, state):
+        """ encode a key record at the start of a segment, else a delta record """
+        frame = frame_to_bytes(green, red)
+        mode_state = ((mode & 0x0F) << 4) | (state & 0x0F)
+        if self.last is None:
+            record = struct.pack('!BdB', KEY_RECORD, stamp, mode_state) + frame
+        else:
+            mask = 0
+            changes = bytearray()
+            for index in range(16):
+                if frame[index] != self.last[index]:
+                    mask |= 1 << index
+                    changes.append(frame[index] ^ self.last[index])
+            elapsed = max(0, int(round((stamp - self.last_time) * 1000.0)))
+            record = (bytes([DELTA_RECORD]) + encode_varint(elapsed) +
+                      struct.pack('!BH', mode_state, mask) + bytes(changes))
+        self.last = frame
+        self.last_time = stamp
+        return record
+
+    def write(self, stamp, green, red, mode, state):
+        """ append a frame, moving to the other segment when this one is full """
+        record = self.encode(stamp, green, red, mode, state)
+        if self.size + len(record) > self.segment_bytes:
+            self.segment = 1 - self.segment
+            self.open_segment()
+            record = self.encode(stamp, green, red, mode, state)
+        self.file.write(record)
+        self.size += len(record)
+
+    def recorder_thread(self,):
+        """ drain the frame queue to disk """
+        self.open_segment()
+        while True:
+            self.ready.wait()
+            self.ready.clear()
+            try:
+                while self.queue:
+                    self.write(*self.queue.popleft())
+                self.file.flush()
+            #pylint: disable=broad-except
+            except Exception as ex:
+                self.logger.debug('Led8x8Recorder: write exception: %s', str(ex))
+                time.sleep(1.0)
+
+    def run(self,):
+        """ start the recorder thread and make it a daemon """
+        recorder = Thread(target=self.recorder_thread)
+        recorder.daemon = True
+        recorder.start()
+
+class Led8x8Replayer:
+    """ read a ring capture and feed it back to a display """
+
+    def __init__(self, path):
+        """ order the segments oldest first """
+        paths = [name for name in segment_paths(path) if os.path.exists(name)]
+        self.paths = sorted(paths, key=os.path.getmtime)
+
+    def frames(self,):
+        """ yield (monotonic time, green, red, mode, state) for every recorded frame """
+        for name in self.paths:
+            with open(name, 'rb') as segment:
+                data = segment.read()
+            if not data.startswith(MAGIC):
+                continue
+            position = len(MAGIC)
+            frame = None
+            stamp = 0.0
+            while position < len(data):
+                try:
+                    kind = data[position]
+                    if kind == KEY_RECORD:
+                        _, stamp, mode_state = struct.unpack_from('!BdB', data, position)
+                        position += 10
+                        frame = bytearray(data[position:position + 16])
+                        position += 16
+                    elif kind == DELTA_RECORD and frame is not None:
+                        elapsed, position = decode_varint(data, position + 1)
+                        mode_state, mask = struct.unpack_from('!BH', data, position)
+                        position += 3
+                        stamp += elapsed / 1000.0
+                        for index in range(16):
+                            if mask & (1 << index):
+                                frame[index] ^= data[position]
+                                position += 1
+                    else:
+                        break
+                except (IndexError, struct.error):
+                    # the last record was cut short by a crash or power loss
+                    break
+                if len(frame) < 16:
+                    break
+                green, red = bytes_to_frame(frame)
+                yield stamp, green, red, mode_state >> 4, mode_state & 0x0F
+
+    def play(self, show, realtime=True):
+        """ call show(green, red, mode, state) for every frame at recorded or full speed """
+        count = 0
+        start = time.perf_counter()
+        due = start
+        previous = None
+        for stamp, green, red, mode, state in self.frames():
+            if realtime:
+                if previous is not None:
+                    # monotonic time restarts after a reboot so clamp the gaps
+                    due += min(max(stamp - previous, 0.0), MAX_REPLAY_GAP)
+                previous = stamp
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            show(green, red, mode, state)
+            count += 1
+        elapsed = time.perf_counter() - start
+        return {'frames': count, 'seconds': elapsed,
+                'fps': count / elapsed if elapsed > 0 else 0.0}
+
+if __name__ == '__main__':
+    sys.exit()
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+
+""" Large toroidal Game of Life universe seen through an 8x8 viewport """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# The universe is packed into one Python integer with cell (x, y) at bit
+# x * size + y, the 8x8 board layout widened: each column is size bits and
+# the columns follow one another. A generation is the same shifts and bitwise
+# adds as the 8x8 step, done on the whole universe at once, so the cost grows
+# with the number of machine words in the integer rather than with a Python
+# loop over cells.
+#
+# The viewport is an 8x8 window onto the universe. When fewer than
+# MIN_ACTIVITY cells change in it the universe is scanned a band of eight
+# columns at a time for the tile that changed most, and the viewport pans
+# towards it.
+
+import sys
+import random
+
+VIEW = 8
+MIN_ACTIVITY = 4
+FOLLOW_STEP = 2
+RESCAN_GENERATIONS = 8
+
+def popcount(value):
+    """ number of cells set in a board """
+    return bin(value).count('1')
+
+def torus_distance(start, end, size):
+    """ shortest signed distance from start to end around a torus """
+    distance = (end - start) % size
+    if distance > size // 2:
+        distance -= size
+    return distance
+
+class Led8x8Universe:
+    """ bit packed toroidal universe with a viewport that follows activity """
+
+    __slots__ = ('size', 'board_mask', 'column_mask', 'low_mask', 'high_mask',
+                 'view_x', 'view_y', 'target', 'quiet', 'history')
+
+    def __init__(self, size=64):
+        """ build the edge masks for a size x size universe """
+        if size < VIEW or size % VIEW:
+            raise ValueError('universe size must be a multiple of 8 was: {}'.format(size))
+        self.size = size
+        self.board_mask = (1 << (size * size)) - 1
+        self.column_mask = (1 << size) - 1
+        # the first and last cell of every column, for wrapping north and south
+        self.low_mask = 0
+        for column in range(size):
+            self.low_mask |= 1 << (column * size)
+        self.high_mask = self.low_mask << (size - 1)
+        self.view_x = 0
+        self.view_y = 0
+        self.target = None
+        self.quiet = 0
+        self.history = (None, None)
+
+    def step(self, board):
+        """ advance the packed universe by one generation """
+        shift = self.size * (self.size - 1)
+        mask = self.board_mask
+        west = ((board << self.size) | (board >> shift)) & mask
+        east = ((board >> self.size) | (board << shift)) & mask
+        high_mask = self.high_mask
+        low_mask = self.low_mask
+        last = self.size - 1
+        sum0 = 0
+        sum1 = 0
+        sum2 = 0
+        for index, column in enumerate((west, board, east)):
+            south = ((column >> 1) & ~high_mask) | ((column << last) & high_mask)
+            north = ((column << 1) & ~low_mask) | ((column >> last) & low_mask)
+            # the cell itself is not one of its neighbors
+            neighbors = (south, north) if index == 1 else (column, south, north)
+            for cell in neighbors:
+                carry0 = sum0 & cell
+                sum0 ^= cell
+                carry1 = sum1 & carry0
+                sum1 ^= carry0
+                sum2 ^= carry1
+        # two or three neighbors keep a live cell, exactly three create one
+        return sum1 & ~sum2 & (sum0 | board) & mask
+
+    def soup(self,):
+        """ a random universe with about three cells in eight alive """
+        bits = self.size * self.size
+        self.history = (None, None)
+        self.target = None
+        self.quiet = 0
+        return random.getrandbits(bits) & (random.getrandbits(bits) | random.getrandbits(bits))
+
+    def window(self, board):
+        """ the 8x8 frame of a board under the viewport """
+        frame = 0
+        size = self.size
+        view_y = self.view_y
+        for xpixel in range(VIEW):
+            column = (board >> (((self.view_x + xpixel) % size) * size)) & self.column_mask
+            column = ((column >> view_y) | (column << (size - view_y))) & 0xFF
+            frame |= column << (xpixel * VIEW)
+        return frame
+
+    def busiest(self, activity):
+        """ origin of the 8x8 tile with the most changing rows, or None """
+        size = self.size
+        band_mask = (1 << (size * VIEW)) - 1
+        best = 0
+        target = None
+        for tile_x in range(0, size, VIEW):
+            band = (activity >> (tile_x * size)) & band_mask
+            if not band:
+                continue
+            # fold the eight columns of the band into one
+            folded = 0
+            while band:
+                folded |= band & self.column_mask
+                band >>= size
+            for tile_y in range(0, size, VIEW):
+                count = popcount((folded >> tile_y) & 0xFF)
+                if count > best:
+                    best = count
+                    target = (tile_x, tile_y)
+        return target
+
+    def follow(self, activity):
+        """ pan the viewport towards the busiest part of the universe """
+        if popcount(self.window(activity)) >= MIN_ACTIVITY:
+            self.quiet = 0
+            self.target = None
+            return
+        self.quiet += 1
+        if self.target is None or self.quiet % RESCAN_GENERATIONS == 0:
+            self.target = self.busiest(activity) or self.target
+        if self.target is None:
+            return
+        for axis, position in enumerate((self.view_x, self.view_y)):
+            distance = torus_distance(position, self.target[axis], self.size)
+            distance = max(-FOLLOW_STEP, min(FOLLOW_STEP, distance))
+            if axis == 0:
+                self.view_x = (position + distance) % self.size
+            else:
+                self.view_y = (position + distance) % self.size
+
+    def update(self, before, board):
+        """ follow the generation just stepped; False once the universe has
+            settled into still lifes and period two oscillators
+        """
+        self.follow(before ^ board)
+        settled = board == self.history[0]
+        self.history = (self.history[1], board)
+        return not settled
+
+if __name__ == '__main__':
+    sys.exit()
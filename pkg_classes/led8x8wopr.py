@@ -26,51 +26,27 @@
 
 import random
 
-BLACK = 0
-GREEN = 2
-YELLOW = 3
-RED = 1
+from .led8x8pattern import Led8x8Pattern, register_pattern, WOPR_MODE
 
-class Led8x8Wopr:
+class Led8x8Wopr(Led8x8Pattern):
     """ WOPR pattern based on the movie Wargames """
 
-    def __init__(self, matrix8x8x2):
-        """ create initial conditions and saving display and I2C lock """
-        self.matrix = matrix8x8x2
+    __slots__ = ()
 
-    def reset(self,):
-        """ initialize to starting state and set brightness """
-        self.matrix.fill(0)
+    def render(self,):
+        """ scatter 64 random red and yellow pixels, red twice as often """
+        green = 0
+        red = 0
+        for _ in range(64):
+            bit = 1 << (random.randint(0, 7) * 8 + random.randint(0, 7))
+            red |= bit
+            if random.randint(1, 3) == 3:
+                green |= bit
+            else:
+                green &= ~bit
+        return green, red
 
-    def output_row(self, start, finish, color):
-        """ display a section of WOPR based on starting and ending rows """
-        for xpixel in range(8):
-            for ypixel in range(start, finish):
-                bit = random.randint(0, 1)
-                if bit > 0:
-                    self.matrix[xpixel, ypixel] = color
-                    
-    def update(self,):
-        """ display the series as a 64 bit image with alternating colored pixels """
-        self.matrix.fill(0)
-        for i in range(64):
-            x = random.randint(0, 7)
-            y = random.randint(0, 7)
-            bit = random.randint(1, 3)
-            if bit == 2:
-                bit = 1
-            self.matrix[x,y] = bit
-
-            
-    def updateO(self,):
-        """ display the series as a 64 bit image with alternating colored pixels """
-        self.matrix.fill(0)
-        self.output_row(5, 8, RED)
-        self.output_row(0, 1, RED)
-        self.output_row(2, 4, RED)
-        self.output_row(4, 5, YELLOW)
-        self.output_row(1, 2, YELLOW)
+register_pattern(WOPR_MODE, Led8x8Wopr, 0.2, demo=True)
 
 if __name__ == '__main__':
     exit()
-
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+
+""" Resilient I2C frame writer for an Adafruit 8x8 bicolor LED backpack """
+
+# MIT License
+#
+# Copyright (c) 2019 Dave Wilson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# A failed write leaves the frame pending and schedules a retry with an
+# exponential backoff. The display thread keeps rendering and calls service()
+# every tick, so retries never block it. After REINIT_AFTER failures in a row
+# the I2C bus and matrix are created again. The newest frame is kept, so the
+# first successful write after an outage replays it along with the brightness
+# and the display looks the same as it did before.
+
+import sys
+import time
+from collections import deque
+from threading import Lock
+import logging
+import logging.config
+
+from .led8x8framebuffer import Led8x8FrameBuffer, ALL_PIXELS
+
+BACKOFF_START = 0.05
+BACKOFF_LIMIT = 5.0
+REINIT_AFTER = 3
+ERROR_WINDOW = 60.0
+ERROR_WARNING = 20
+
+def open_matrix():
+    """ create the I2C interface and the HT16K33 matrix; imported here so that
+        a simulated display runs without the Blinka and CircuitPython libraries
+    """
+    #pylint: disable=import-outside-toplevel
+    import board
+    import busio
+    # Import the HT16K33 LED matrix module.
+    from adafruit_ht16k33 import matrix
+    i2c = busio.I2C(board.SCL, board.SDA)
+    # Frames are written whole by Led8x8Writer.write().
+    return i2c, matrix.Matrix8x8x2(i2c, auto_write=False)
+
+#pylint: disable=too-many-instance-attributes
+
+class Led8x8Writer:
+    """ write frames to the LED backpack, riding out I2C errors """
+
+    def __init__(self, logging_file, simulate=False):
+        """ open the device and clear the display """
+        logging.config.fileConfig(fname=logging_file, disable_existing_loggers=False)
+        # Get the logger specified in the file
+        self.logger = logging.getLogger(__name__)
+        self.simulate = simulate
+        self.lock = Lock()
+        self.i2c = None
+        self.matrix8x8 = None
+        self.device_frame = None
+        self.brightness = 1.0
+        self.frame = (0, 0)
+        self.dirty = True
+        self.restore = True
+        self.next_attempt = 0.0
+        self.backoff = BACKOFF_START
+        self.consecutive_failures = 0
+        self.error_times = deque()
+        self.start_time = time.time()
+        self.outage_start = None
+        self.metrics = {
+            'writes': 0,
+            'failures': 0,
+            'reinits': 0,
+            'recoveries': 0,
+            'last_recovery_seconds': 0.0,
+            'outage_seconds': 0.0,
+        }
+        try:
+            self.open()
+        #pylint: disable=broad-except
+        except Exception as ex:
+            self.failed(time.time(), ex)
+        self.service()
+
+    def open(self,):
+        """ create, or create again, the I2C bus and the matrix """
+        self.device_frame = None
+        if self.simulate:
+            self.matrix8x8 = Led8x8FrameBuffer()
+            return
+        if self.i2c is not None:
+            try:
+                self.i2c.deinit()
+            #pylint: disable=broad-except
+            except Exception:
+                pass
+        self.i2c, self.matrix8x8 = open_matrix()
+
+    def write_device(self, green, red):
+        """ copy the green and red planes to the LED backpack in one I2C write,
+            updating only the pixels that changed since the last write; return
+            False without touching the bus when nothing changed
+        """
+        if self.device_frame is None:
+            changed = ALL_PIXELS
+        else:
+            changed = (green ^ self.device_frame[0]) | (red ^ self.device_frame[1])
+        if not changed:
+            return False
+        self.device_frame = None
+        while changed:
+            bit = changed & -changed
+            shift = bit.bit_length() - 1
+            self.matrix8x8[shift >> 3, shift & 7] = (((red >> shift) & 1) |
+                                                     (((green >> shift) & 1) << 1))
+            changed ^= bit
+        self.matrix8x8.show()
+        self.device_frame = (green, red)
+        return True
+
+    def write(self, green, red):
+        """ write a frame now or, during an outage, when the next retry is due """
+        with self.lock:
+            self.frame = (green, red)
+            self.dirty = True
+        self.service()
+
+    def set_brightness(self, brightness):
+        """ set the brightness, reapplied after the bus is created again """
+        with self.lock:
+            self.brightness = brightness
+            self.dirty = True
+            self.restore = True
+        self.service()
+
+    def service(self,):
+        """ retry a pending frame when its backoff has expired; call every tick """
+        with self.lock:
+            if not self.dirty:
+                return
+            now = time.time()
+            if now < self.next_attempt:
+                return
+            green, red = self.frame
+            try:
+                if self.restore:
+                    # the device may have lost its state so restore brightness too
+                    self.matrix8x8.brightness = self.brightness
+                written = self.write_device(green, red)
+            #pylint: disable=broad-except
+            except Exception as ex:
+                self.failed(now, ex)
+                return
+            self.dirty = False
+            self.restore = False
+            if written:
+                self.metrics['writes'] += 1
+            if self.outage_start is not None:
+                self.recovered(now)
+            self.consecutive_failures = 0
+            self.backoff = BACKOFF_START
+            self.next_attempt = 0.0
+
+    def failed(self, now, ex):
+        """ count the error, schedule the retry and create the bus again if needed """
+        self.expire_errors(now)
+        self.metrics['failures'] += 1
+        self.consecutive_failures += 1
+        self.error_times.append(now)
+        if self.outage_start is None:
+            self.outage_start = now
+            self.logger.warning('Led8x8Writer: display unavailable: %s', str(ex))
+        if len(self.error_times) == ERROR_WARNING:
+            self.logger.warning('Led8x8Writer: %d errors in %.0f seconds',
+                                ERROR_WARNING, ERROR_WINDOW)
+        self.next_attempt = now + self.backoff
+        self.backoff = min(self.backoff * 2.0, BACKOFF_LIMIT)
+        self.restore = True
+        if self.consecutive_failures % REINIT_AFTER == 0:
+            try:
+                self.open()
+                self.metrics['reinits'] += 1
+            #pylint: disable=broad-except
+            except Exception as reinit_ex:
+                self.logger.debug('Led8x8Writer: bus init exception: %s', str(reinit_ex))
+
+    def recovered(self, now):
+        """ record how long the display was unavailable """
+        outage = now - self.outage_start
+        self.outage_start = None
+        self.metrics['recoveries'] += 1
+        self.metrics['last_recovery_seconds'] = outage
+        self.metrics['outage_seconds'] += outage
+        self.logger.warning('Led8x8Writer: display recovered after %.1f seconds', outage)
+
+    def expire_errors(self, now):
+        """ forget errors older than the error window """
+        while self.error_times and self.error_times[0] < now - ERROR_WINDOW:
+            self.error_times.popleft()
+
+    def get_metrics(self,):
+        """ return availability, error and recovery figures """
+        with self.lock:
+            now = time.time()
+            self.expire_errors(now)
+            outage = self.metrics['outage_seconds']
+            if self.outage_start is not None:
+                outage += now - self.outage_start
+            metrics = dict(self.metrics)
+            metrics['available'] = self.outage_start is None
+            metrics['errors_in_window'] = len(self.error_times)
+            metrics['availability'] = 1.0 - outage / max(now - self.start_time, 1e-6)
+            return metrics
+
+if __name__ == '__main__':
+    sys.exit()